@@ -6,11 +6,57 @@ A comprehensive travel planning assistant for elderly travelers.
 __version__ = "2.0.0"
 __author__ = "Travel Assistant Team"
 
-# Import main components for easy access
+import importlib
+
+# Configuration has no third-party dependencies, so it is imported eagerly
 from .config.config import *
-from .api.openai_client import *
-from .utils.helpers import *
-from .core.travel_functions import *
-from .data.processors import *
-from .ui.components import *
-from .main import create_app, main
\ No newline at end of file
+
+# Other components are imported on first attribute access (PEP 562), so
+# importing the package does not pull in openai, gradio and friends.
+# Later modules win on name clashes, matching the former star-import order.
+_LAZY_EXPORTS = {
+    ".api.openai_client": ("OpenAIClient", "APICallError", "get_client"),
+    ".utils.helpers": (
+        "clean_response", "validate_inputs", "safe_json_parse", "format_interests",
+        "format_health_focus", "sanitize_filename", "truncate_text",
+        "extract_json_from_text", "is_valid_chinese_location", "extract_hotels_from_itinerary",
+    ),
+    ".core.travel_functions": (
+        "generate_destination_recommendation", "generate_itinerary_plan", "generate_checklist",
+        "agenerate_all", "generate_all",
+        "format_checklist_html", "create_checklist_section", "create_booking_guides_section",
+        "create_tips_section", "format_checklist_text",
+    ),
+    ".data.processors": (
+        "save_checklist_data", "load_checklist_data", "format_travel_history",
+        "process_weather_data", "format_destination_info", "create_travel_summary",
+    ),
+    ".ui.components": (
+        "create_header", "create_destination_section", "create_itinerary_section",
+        "create_checklist_section", "create_video_editor_section", "create_footer",
+        "create_loading_animation", "hide_loading_animation", "create_app_theme",
+    ),
+    ".main": ("create_app", "main"),
+}
+
+_ATTRIBUTE_MODULES = {
+    name: module for module, names in _LAZY_EXPORTS.items() for name in names
+}
+
+
+def __getattr__(name):
+    """Import the module providing ``name`` on first access."""
+    module_name = _ATTRIBUTE_MODULES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = importlib.import_module(module_name, __name__)
+    # Bind every name this module provides, which also restores ``main``
+    # to the function after the import system bound the submodule there
+    for attr in _LAZY_EXPORTS[module_name]:
+        if _ATTRIBUTE_MODULES[attr] == module_name:
+            globals()[attr] = getattr(module, attr)
+    return globals()[name]
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_ATTRIBUTE_MODULES))
@@ -3,16 +3,173 @@ OpenAI API client module for the travel assistant application.
 Handles all API communications with the AI model.
 """
 
-import openai
-from typing import Optional, Dict, Any
+import asyncio
+import atexit
+import importlib.util
+import logging
+import os
+import random
+import re
+import threading
+import time
+from typing import Optional, Dict, Any, Iterator, List, Tuple, Union
 try:
-    from ..config.config import API_KEY, API_BASE, MODEL_NAME, MAX_TOKENS, TEMPERATURE
+    from ..config.config import (
+        API_KEY, API_BASE, MODEL_NAME, MAX_TOKENS, TEMPERATURE,
+        API_MAX_ATTEMPTS, RETRY_INITIAL_DELAY, RETRY_MAX_DELAY,
+        API_TIMEOUT, API_CONNECT_TIMEOUT, API_MAX_CONNECTIONS, API_MAX_KEEPALIVE_CONNECTIONS,
+        EXACT_CACHE_SIZE, CACHE_DIR, DISK_CACHE_TTL, EMBEDDING_MODEL_NAME, SEMANTIC_CACHE_THRESHOLD,
+        SEMANTIC_CACHE_TTL, NO_CACHE_PATTERN,
+        DESTINATION_SYSTEM_PROMPT, ITINERARY_SYSTEM_PROMPT, CHECKLIST_SYSTEM_PROMPT,
+        DESTINATION_MODEL_NAME, ITINERARY_MODEL_NAME, CHECKLIST_MODEL_NAME, CHECKLIST_JSON_MODE
+    )
+    from .response_cache import DiskCache, ExactMatchCache, SemanticCache
 except ImportError:
     # Handle direct execution
     import sys
-    import os
-    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-    from config.config import API_KEY, API_BASE, MODEL_NAME, MAX_TOKENS, TEMPERATURE
+    _SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if _SRC_DIR not in sys.path:
+        sys.path.insert(0, _SRC_DIR)
+    from config.config import (
+        API_KEY, API_BASE, MODEL_NAME, MAX_TOKENS, TEMPERATURE,
+        API_MAX_ATTEMPTS, RETRY_INITIAL_DELAY, RETRY_MAX_DELAY,
+        API_TIMEOUT, API_CONNECT_TIMEOUT, API_MAX_CONNECTIONS, API_MAX_KEEPALIVE_CONNECTIONS,
+        EXACT_CACHE_SIZE, CACHE_DIR, DISK_CACHE_TTL, EMBEDDING_MODEL_NAME, SEMANTIC_CACHE_THRESHOLD,
+        SEMANTIC_CACHE_TTL, NO_CACHE_PATTERN,
+        DESTINATION_SYSTEM_PROMPT, ITINERARY_SYSTEM_PROMPT, CHECKLIST_SYSTEM_PROMPT,
+        DESTINATION_MODEL_NAME, ITINERARY_MODEL_NAME, CHECKLIST_MODEL_NAME, CHECKLIST_JSON_MODE
+    )
+    from api.response_cache import DiskCache, ExactMatchCache, SemanticCache
+
+# Prompts containing time-sensitive words must always hit the API
+_NO_CACHE_RE = re.compile(NO_CACHE_PATTERN)
+
+_logger = logging.getLogger(__name__)
+
+# User prompt templates, filled with str.format by the generators below
+_DESTINATION_USER_TEMPLATE = """
+请根据以下条件推荐适合银发族的国内旅行目的地：
+
+1. 季节：{season}
+2. 健康状况：{health_status}
+3. 预算范围：{budget}
+4. 兴趣偏好：{interests}
+
+请推荐3-5个目的地，并说明推荐理由，考虑以下因素：
+- 气候适宜性
+- 交通便利程度
+- 医疗条件
+- 住宿条件
+- 景点特色
+- 适合老年人的活动
+- 安全因素
+
+请用温暖、耐心的语气，像对待长辈一样详细说明每个推荐地的特点。
+"""
+
+_ITINERARY_USER_TEMPLATE = """
+请为银发族制定一份详细的旅行行程计划：
+
+1. 目的地：{destination}
+2. 旅行时长：{duration}
+3. 行动能力：{mobility}
+4. 健康关注点：{health_focus}
+
+请制定一份详细的行程计划，包括：
+- 每日具体安排（时间、地点、活动）
+- 交通方式和路线
+- 住宿推荐
+- 餐饮建议
+- 休息安排
+- 注意事项
+- 应急准备
+
+请特别考虑银发族的特点，安排充足的休息时间，避免过于紧凑的行程。
+请用温暖、关怀的语气，像为父母规划旅行一样细心周到。
+"""
+
+_CHECKLIST_USER_TEMPLATE = """
+请为银发族生成一份详细的旅行清单：
+
+1. 出发地：{origin}
+2. 目的地：{destination}
+3. 旅行时长：{duration}
+4. 特殊需求：{special_needs}
+{itinerary_context}
+
+请生成一份详细的旅行清单，包括：
+- 证件类（身份证、医保卡、老年证等）
+- 衣物类（根据季节和目的地气候）
+- 药品类（常用药品、应急药品）
+- 生活用品类
+- 电子设备类
+- 财务准备
+- 安全用品
+- 娱乐用品
+- 特殊用品（根据健康状况）
+
+请用JSON格式返回，包含以下字段：
+- documents: 证件类清单
+- clothing: 衣物类清单
+- medications: 药品类清单
+- daily_items: 生活用品清单
+- electronics: 电子设备清单
+- financial: 财务准备清单
+- safety: 安全用品清单
+- entertainment: 娱乐用品清单
+- special_items: 特殊用品清单
+- tips: 温馨提示列表
+
+请用温暖、细致的语气，像为父母准备行李一样周到贴心。
+"""
+
+
+class APICallError(RuntimeError):
+    """Raised when a request to the model API fails."""
+
+
+def _is_retryable(error: Exception) -> bool:
+    """Whether an API error is transient (rate limit, network, server error)."""
+    import openai
+    
+    # Bad requests and auth errors are deterministic and never retried
+    return isinstance(error, (
+        openai.RateLimitError,
+        openai.APIConnectionError,
+        openai.InternalServerError
+    ))
+
+
+def _retry_delay(error: Exception, attempt: int) -> float:
+    """
+    Compute how long to wait before the next attempt.
+    
+    Honors the Retry-After header of rate-limit responses, otherwise uses
+    exponential backoff with jitter. Either way the wait is capped at
+    RETRY_MAX_DELAY so a worker is never blocked for long.
+    """
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    retry_after = headers.get("retry-after")
+    if retry_after:
+        try:
+            return min(max(0.0, float(retry_after)), RETRY_MAX_DELAY)
+        except ValueError:
+            pass
+    
+    delay = RETRY_INITIAL_DELAY * (2 ** attempt) + random.uniform(0, RETRY_INITIAL_DELAY)
+    return min(delay, RETRY_MAX_DELAY)
+
+
+def _semantic_partition(system_prompt: str, partition: str) -> str:
+    """Combine the system prompt and the discrete request fields into one partition."""
+    return f"{system_prompt}\n{partition}"
+
+
+def _message_text(response) -> str:
+    """Return the stripped text of the first choice, or "" if it has no content."""
+    content = response.choices[0].message.content
+    return content.strip() if content else ""
 
 
 class OpenAIClient:
@@ -21,51 +178,382 @@ class OpenAIClient:
     def __init__(self):
         """Initialize the OpenAI client with configuration."""
         self.client = None
+        self.exact_cache = ExactMatchCache(EXACT_CACHE_SIZE)
+        self.disk_cache = None
+        self.semantic_cache = None
+        self.last_usage = None
         self._initialize_client()
     
     def _initialize_client(self):
         """Initialize the OpenAI client with API key and base URL."""
         if not API_KEY:
             raise ValueError("API密钥未设置。请在.env文件中设置MODEL_API_KEY")
+        # Fail here rather than on the first request after a connection attempt
+        if not API_BASE.startswith(("http://", "https://")):
+            raise ValueError(f"API地址无效: {API_BASE}")
+        
+        # Imported lazily so importing this module does not load the SDK
+        import openai
         
+        # Retries are handled by _create_completion, not by the SDK.
+        # One pooled keep-alive HTTP client is shared by all generators.
         self.client = openai.OpenAI(
             api_key=API_KEY,
-            base_url=API_BASE
+            base_url=API_BASE,
+            max_retries=0,
+            http_client=_create_http_client()
         )
+        
+        self.disk_cache = DiskCache(
+            os.path.join(CACHE_DIR, "response_cache.sqlite3"),
+            ttl=DISK_CACHE_TTL
+        )
+        
+        if EMBEDDING_MODEL_NAME:
+            self.semantic_cache = SemanticCache(
+                os.path.join(CACHE_DIR, "semantic_cache.sqlite3"),
+                embed_fn=self.embed_text,
+                threshold=SEMANTIC_CACHE_THRESHOLD,
+                ttl=SEMANTIC_CACHE_TTL
+            )
+    
+    def embed_text(self, text: str) -> List[float]:
+        """
+        Compute an embedding vector for the given text.
+        
+        Args:
+            text: Text to embed
+            
+        Returns:
+            The embedding vector
+        """
+        response = self.client.embeddings.create(model=EMBEDDING_MODEL_NAME, input=text)
+        return response.data[0].embedding
     
     def generate_response(self, 
                          system_prompt: str, 
                          user_prompt: str, 
                          max_tokens: Optional[int] = None,
-                         temperature: Optional[float] = None) -> str:
+                         temperature: Optional[float] = None,
+                         model: Optional[str] = None,
+                         response_format: Optional[Dict[str, Any]] = None,
+                         cache_namespace: str = "default",
+                         no_cache: bool = False,
+                         semantic_key: Optional[Tuple[str, str]] = None) -> str:
         """
         Generate a response using the OpenAI API.
         
+        Identical requests are answered from an in-memory LRU cache backed
+        by an on-disk cache that survives restarts. Requests that pass a
+        semantic_key can also match near-duplicates in the semantic cache
+        when it is enabled (see EMBEDDING_MODEL_NAME in the configuration).
+        
         Args:
             system_prompt: The system prompt to guide the AI behavior
             user_prompt: The user's input prompt
             max_tokens: Maximum tokens for the response (overrides default)
             temperature: Temperature for response generation (overrides default)
+            model: Model to use (overrides MODEL_NAME)
+            response_format: Optional response format, e.g. {"type": "json_object"}
+            cache_namespace: Cache namespace so different generators never share entries
+            no_cache: Skip the cache and always call the API
+            semantic_key: Optional (partition, text) for the semantic cache.
+                Only the text is embedded; requests match only within the
+                same partition, which should hold the discrete fields.
             
         Returns:
             The generated response text
             
         Raises:
-            Exception: If API call fails
+            APICallError: If API call fails
         """
+        body = self.build_request_body(
+            system_prompt, user_prompt, max_tokens, temperature, model, response_format
+        )
+        cached, cache_key, embedding = self._lookup_cache(body, cache_namespace, no_cache, semantic_key)
+        if cached is not None:
+            return cached
+        
         try:
-            response = self.client.chat.completions.create(
-                model=MODEL_NAME,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                max_tokens=max_tokens or MAX_TOKENS,
-                temperature=temperature or TEMPERATURE
-            )
-            return response.choices[0].message.content.strip()
+            response = self._create_completion(**body)
+            result = _message_text(response)
+        except Exception as e:
+            raise APICallError(f"API调用失败: {e}") from None
+        
+        self._store_cache(body, cache_namespace, cache_key, embedding, result, semantic_key)
+        return result
+    
+    def generate_response_stream(self,
+                                 system_prompt: str,
+                                 user_prompt: str,
+                                 max_tokens: Optional[int] = None,
+                                 temperature: Optional[float] = None,
+                                 model: Optional[str] = None,
+                                 response_format: Optional[Dict[str, Any]] = None,
+                                 cache_namespace: str = "default",
+                                 no_cache: bool = False,
+                                 semantic_key: Optional[Tuple[str, str]] = None) -> Iterator[str]:
+        """
+        Generate a response and yield it piece by piece as tokens arrive.
+        
+        Lets the UI start rendering long itineraries before the whole
+        completion is finished. Cached responses are yielded in one piece,
+        and the complete text is cached once the stream ends. Token usage
+        reported by the stream is kept in ``last_usage``.
+        
+        Args:
+            Same as generate_response()
+            
+        Yields:
+            Text fragments of the response
+            
+        Raises:
+            APICallError: If API call fails
+        """
+        body = self.build_request_body(
+            system_prompt, user_prompt, max_tokens, temperature, model, response_format
+        )
+        cached, cache_key, embedding = self._lookup_cache(body, cache_namespace, no_cache, semantic_key)
+        if cached is not None:
+            yield cached
+            return
+        
+        parts = []
+        self.last_usage = None
+        try:
+            # Without include_usage the stream never reports token usage
+            for chunk in self._create_completion(
+                stream=True, stream_options={"include_usage": True}, **body
+            ):
+                if getattr(chunk, "usage", None):
+                    self.last_usage = chunk.usage
+                if not chunk.choices:
+                    continue
+                text = chunk.choices[0].delta.content
+                if text:
+                    parts.append(text)
+                    yield text
         except Exception as e:
-            raise Exception(f"API调用失败: {str(e)}")
+            raise APICallError(f"API调用失败: {e}") from None
+        
+        self._store_cache(
+            body, cache_namespace, cache_key, embedding, "".join(parts).strip(), semantic_key
+        )
+    
+    async def agenerate_responses(self,
+                                  requests: List[Dict[str, Any]],
+                                  max_concurrency: int = 8) -> List[Union[str, Exception]]:
+        """
+        Generate several responses concurrently.
+        
+        All requests are dispatched at once on an AsyncOpenAI client, with a
+        semaphore bounding the number of in-flight calls to respect rate
+        limits. Cache lookups behave exactly as in generate_response().
+        
+        Args:
+            requests: List of generate_response() keyword arguments
+            max_concurrency: Maximum number of simultaneous API calls
+            
+        Returns:
+            Responses in request order; a failed request yields its exception
+        """
+        import openai
+        
+        semaphore = asyncio.Semaphore(max_concurrency)
+        # Async HTTP clients are bound to the running event loop, so each call
+        # gets its own pool, configured like the shared synchronous one
+        async_client = openai.AsyncOpenAI(
+            api_key=API_KEY,
+            base_url=API_BASE,
+            max_retries=0,
+            http_client=_create_http_client(asynchronous=True)
+        )
+        
+        async def run_one(request: Dict[str, Any]) -> str:
+            async with semaphore:
+                return await self._agenerate_one(async_client, **request)
+        
+        try:
+            return await asyncio.gather(*(run_one(r) for r in requests), return_exceptions=True)
+        finally:
+            await async_client.close()
+    
+    def generate_responses(self,
+                           requests: List[Dict[str, Any]],
+                           max_concurrency: int = 8) -> List[Union[str, Exception]]:
+        """Synchronous wrapper around agenerate_responses()."""
+        return asyncio.run(self.agenerate_responses(requests, max_concurrency))
+    
+    async def _agenerate_one(self,
+                             async_client,
+                             system_prompt: str,
+                             user_prompt: str,
+                             max_tokens: Optional[int] = None,
+                             temperature: Optional[float] = None,
+                             model: Optional[str] = None,
+                             response_format: Optional[Dict[str, Any]] = None,
+                             cache_namespace: str = "default",
+                             no_cache: bool = False,
+                             semantic_key: Optional[Tuple[str, str]] = None) -> str:
+        """Async counterpart of generate_response() using the given client."""
+        body = self.build_request_body(
+            system_prompt, user_prompt, max_tokens, temperature, model, response_format
+        )
+        # The semantic cache lookup may block on an embedding call
+        cached, cache_key, embedding = await asyncio.to_thread(
+            self._lookup_cache, body, cache_namespace, no_cache, semantic_key
+        )
+        if cached is not None:
+            return cached
+        
+        try:
+            response = await self._acreate_completion(async_client, **body)
+            result = _message_text(response)
+        except Exception as e:
+            raise APICallError(f"API调用失败: {e}") from None
+        
+        await asyncio.to_thread(
+            self._store_cache, body, cache_namespace, cache_key, embedding, result, semantic_key
+        )
+        return result
+    
+    def _create_completion(self, **kwargs):
+        """Call the chat completions API, retrying transient failures."""
+        for attempt in range(API_MAX_ATTEMPTS):
+            try:
+                return self.client.chat.completions.create(**kwargs)
+            except Exception as e:
+                if attempt == API_MAX_ATTEMPTS - 1 or not _is_retryable(e):
+                    raise
+                time.sleep(_retry_delay(e, attempt))
+    
+    async def _acreate_completion(self, async_client, **kwargs):
+        """Async counterpart of _create_completion()."""
+        for attempt in range(API_MAX_ATTEMPTS):
+            try:
+                return await async_client.chat.completions.create(**kwargs)
+            except Exception as e:
+                if attempt == API_MAX_ATTEMPTS - 1 or not _is_retryable(e):
+                    raise
+                await asyncio.sleep(_retry_delay(e, attempt))
+    
+    def _lookup_cache(self,
+                      body: Dict[str, Any],
+                      cache_namespace: str,
+                      no_cache: bool,
+                      semantic_key: Optional[Tuple[str, str]] = None) -> Tuple[Optional[str], Optional[str], Any]:
+        """
+        Look up a request in the exact-match, disk and semantic caches.
+        
+        Returns:
+            Tuple of (cached response or None, exact cache key, embedding).
+            The key and embedding are None when the request must not be cached.
+        """
+        system_prompt = body["messages"][0]["content"]
+        user_prompt = body["messages"][-1]["content"]
+        if no_cache or _NO_CACHE_RE.search(user_prompt):
+            return None, None, None
+        
+        cache_key = ExactMatchCache.make_key(
+            cache_namespace, body["model"], body["max_tokens"], body["temperature"],
+            system_prompt, user_prompt
+        )
+        cached = self.exact_cache.get(cache_key)
+        if cached is not None:
+            return cached, cache_key, None
+        
+        # A broken cache only costs the hit, the request still goes to the API
+        try:
+            cached = self.disk_cache.get(f"{cache_namespace}:{cache_key}")
+        except Exception as e:
+            _logger.warning("读取磁盘缓存失败: %s", e)
+            cached = None
+        if cached is not None:
+            self.exact_cache.set(cache_key, cached)
+            return cached, cache_key, None
+        
+        embedding = None
+        # The shared prompt template would dominate a whole-prompt embedding,
+        # so only requests naming their variable text use the semantic cache
+        if self.semantic_cache is not None and semantic_key is not None:
+            partition, text = semantic_key
+            try:
+                cached, embedding = self.semantic_cache.lookup(
+                    cache_namespace, _semantic_partition(system_prompt, partition), text
+                )
+            except Exception as e:
+                _logger.warning("读取语义缓存失败: %s", e)
+                cached, embedding = None, None
+            if cached is not None:
+                self.exact_cache.set(cache_key, cached)
+                return cached, cache_key, None
+        
+        return None, cache_key, embedding
+    
+    def _store_cache(self,
+                     body: Dict[str, Any],
+                     cache_namespace: str,
+                     cache_key: Optional[str],
+                     embedding: Any,
+                     result: str,
+                     semantic_key: Optional[Tuple[str, str]] = None) -> None:
+        """
+        Store a fresh API response in the caches consulted by _lookup_cache().
+        
+        Empty responses are not cached, and a failing cache write is logged
+        and ignored so it never fails a successful API call.
+        """
+        if not result:
+            return
+        if cache_key is not None:
+            self.exact_cache.set(cache_key, result)
+            try:
+                self.disk_cache.set(f"{cache_namespace}:{cache_key}", result)
+            except Exception as e:
+                _logger.warning("写入磁盘缓存失败: %s", e)
+        if embedding is not None:
+            try:
+                self.semantic_cache.store(
+                    cache_namespace,
+                    _semantic_partition(body["messages"][0]["content"], semantic_key[0]),
+                    embedding, result
+                )
+            except Exception as e:
+                _logger.warning("写入语义缓存失败: %s", e)
+    
+    def build_request_body(self,
+                           system_prompt: str,
+                           user_prompt: str,
+                           max_tokens: Optional[int] = None,
+                           temperature: Optional[float] = None,
+                           model: Optional[str] = None,
+                           response_format: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Build the chat completion request body.
+        
+        Args:
+            system_prompt: The system prompt to guide the AI behavior
+            user_prompt: The user's input prompt
+            max_tokens: Maximum tokens for the response (overrides default)
+            temperature: Temperature for response generation (overrides default)
+            model: Model to use (overrides MODEL_NAME)
+            response_format: Optional response format, e.g. {"type": "json_object"}
+            
+        Returns:
+            Keyword arguments for the chat completions API
+        """
+        body = {
+            "model": model or MODEL_NAME,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            "max_tokens": max_tokens or MAX_TOKENS,
+            "temperature": temperature or TEMPERATURE
+        }
+        if response_format:
+            body["response_format"] = response_format
+        return body
     
     def generate_destination_recommendations(self, 
                                            season: str, 
@@ -84,38 +572,22 @@ class OpenAIClient:
         Returns:
             Generated destination recommendations
         """
-        try:
-            from ..config.config import DESTINATION_SYSTEM_PROMPT
-        except ImportError:
-            from config.config import DESTINATION_SYSTEM_PROMPT
-        
-        user_prompt = f"""
-请根据以下条件推荐适合银发族的国内旅行目的地：
-
-1. 季节：{season}
-2. 健康状况：{health_status}
-3. 预算范围：{budget}
-4. 兴趣偏好：{interests}
-
-请推荐3-5个目的地，并说明推荐理由，考虑以下因素：
-- 气候适宜性
-- 交通便利程度
-- 医疗条件
-- 住宿条件
-- 景点特色
-- 适合老年人的活动
-- 安全因素
-
-请用温暖、耐心的语气，像对待长辈一样详细说明每个推荐地的特点。
-"""
+        user_prompt = _DESTINATION_USER_TEMPLATE.format(
+            season=season, health_status=health_status, budget=budget, interests=interests
+        )
         
-        return self.generate_response(DESTINATION_SYSTEM_PROMPT, user_prompt)
+        return self.generate_response(
+            DESTINATION_SYSTEM_PROMPT, user_prompt,
+            model=DESTINATION_MODEL_NAME, cache_namespace="destination",
+            semantic_key=(f"{season}|{health_status}|{budget}", interests)
+        )
     
     def generate_itinerary_plan(self, 
                               destination: str, 
                               duration: str, 
                               mobility: str, 
-                              health_focus: str) -> str:
+                              health_focus: str,
+                              stream: bool = False) -> Union[str, Iterator[str]]:
         """
         Generate a detailed itinerary plan.
         
@@ -124,37 +596,28 @@ class OpenAIClient:
             duration: Trip duration
             mobility: Mobility status
             health_focus: Health concerns
+            stream: Return an iterator of text fragments, see generate_response_stream()
             
         Returns:
             Generated itinerary plan
         """
-        try:
-            from ..config.config import ITINERARY_SYSTEM_PROMPT
-        except ImportError:
-            from config.config import ITINERARY_SYSTEM_PROMPT
-        
-        user_prompt = f"""
-请为银发族制定一份详细的旅行行程计划：
-
-1. 目的地：{destination}
-2. 旅行时长：{duration}
-3. 行动能力：{mobility}
-4. 健康关注点：{health_focus}
-
-请制定一份详细的行程计划，包括：
-- 每日具体安排（时间、地点、活动）
-- 交通方式和路线
-- 住宿推荐
-- 餐饮建议
-- 休息安排
-- 注意事项
-- 应急准备
-
-请特别考虑银发族的特点，安排充足的休息时间，避免过于紧凑的行程。
-请用温暖、关怀的语气，像为父母规划旅行一样细心周到。
-"""
+        user_prompt = _ITINERARY_USER_TEMPLATE.format(
+            destination=destination, duration=duration, mobility=mobility, health_focus=health_focus
+        )
         
-        return self.generate_response(ITINERARY_SYSTEM_PROMPT, user_prompt)
+        # Destination and dropdowns must match exactly, only the health focus is fuzzy
+        semantic_key = (f"{destination}|{duration}|{mobility}", health_focus)
+        if stream:
+            return self.generate_response_stream(
+                ITINERARY_SYSTEM_PROMPT, user_prompt,
+                model=ITINERARY_MODEL_NAME, cache_namespace="itinerary",
+                semantic_key=semantic_key
+            )
+        return self.generate_response(
+            ITINERARY_SYSTEM_PROMPT, user_prompt,
+            model=ITINERARY_MODEL_NAME, cache_namespace="itinerary",
+            semantic_key=semantic_key
+        )
     
     def generate_checklist(self, 
                           origin: str, 
@@ -175,57 +638,55 @@ class OpenAIClient:
         Returns:
             Generated travel checklist
         """
-        try:
-            from ..config.config import CHECKLIST_SYSTEM_PROMPT
-        except ImportError:
-            from config.config import CHECKLIST_SYSTEM_PROMPT
-        
         itinerary_context = f"\n参考行程：{itinerary_text}" if itinerary_text else ""
         
-        user_prompt = f"""
-请为银发族生成一份详细的旅行清单：
-
-1. 出发地：{origin}
-2. 目的地：{destination}
-3. 旅行时长：{duration}
-4. 特殊需求：{special_needs}
-{itinerary_context}
-
-请生成一份详细的旅行清单，包括：
-- 证件类（身份证、医保卡、老年证等）
-- 衣物类（根据季节和目的地气候）
-- 药品类（常用药品、应急药品）
-- 生活用品类
-- 电子设备类
-- 财务准备
-- 安全用品
-- 娱乐用品
-- 特殊用品（根据健康状况）
+        user_prompt = _CHECKLIST_USER_TEMPLATE.format(
+            origin=origin, destination=destination, duration=duration,
+            special_needs=special_needs, itinerary_context=itinerary_context
+        )
+        
+        # The checklist is parsed as JSON, so ask for JSON mode when enabled
+        response_format = {"type": "json_object"} if CHECKLIST_JSON_MODE else None
+        # No semantic_key: special needs such as "有哮喘" and "没有哮喘" embed
+        # almost identically, so checklists are only reused on an exact match
+        return self.generate_response(
+            CHECKLIST_SYSTEM_PROMPT, user_prompt,
+            model=CHECKLIST_MODEL_NAME, response_format=response_format,
+            cache_namespace="checklist"
+        )
+    
+    def close(self):
+        """Close the underlying HTTP connection pool."""
+        if self.client is not None:
+            self.client.close()
 
-请用JSON格式返回，包含以下字段：
-- documents: 证件类清单
-- clothing: 衣物类清单
-- medications: 药品类清单
-- daily_items: 生活用品清单
-- electronics: 电子设备清单
-- financial: 财务准备清单
-- safety: 安全用品清单
-- entertainment: 娱乐用品清单
-- special_items: 特殊用品清单
-- tips: 温馨提示列表
 
-请用温暖、细致的语气，像为父母准备行李一样周到贴心。
-"""
-        
-        return self.generate_response(CHECKLIST_SYSTEM_PROMPT, user_prompt)
+def _create_http_client(asynchronous: bool = False):
+    """Create the pooled HTTP client, using HTTP/2 when the h2 package is installed."""
+    import httpx
+    
+    client_class = httpx.AsyncClient if asynchronous else httpx.Client
+    return client_class(
+        http2=importlib.util.find_spec("h2") is not None,
+        timeout=httpx.Timeout(API_TIMEOUT, connect=API_CONNECT_TIMEOUT),
+        limits=httpx.Limits(
+            max_keepalive_connections=API_MAX_KEEPALIVE_CONNECTIONS,
+            max_connections=API_MAX_CONNECTIONS
+        )
+    )
 
 
 # Global client instance
 _client_instance = None
+_client_lock = threading.Lock()
 
 def get_client() -> OpenAIClient:
     """Get the global OpenAI client instance."""
     global _client_instance
     if _client_instance is None:
-        _client_instance = OpenAIClient()
+        # Generators may run in worker threads (see generate_all)
+        with _client_lock:
+            if _client_instance is None:
+                _client_instance = OpenAIClient()
+                atexit.register(_client_instance.close)
     return _client_instance
\ No newline at end of file
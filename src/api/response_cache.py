@@ -0,0 +1,242 @@
+"""
+Response cache module for the travel assistant application.
+Stores AI responses so repeated or near-duplicate prompts skip the API call.
+"""
+
+import hashlib
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from typing import Callable, List, Optional, Tuple
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+class ExactMatchCache:
+    """In-memory LRU cache keyed on the SHA-256 of the normalized request."""
+
+    def __init__(self, maxsize: int = 512):
+        """
+        Initialize the exact-match cache.
+
+        Args:
+            maxsize: Maximum number of cached responses
+        """
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(*parts) -> str:
+        """
+        Build a cache key from the request parts.
+
+        Whitespace is collapsed and text is lowercased so trivially different
+        prompts share the same key.
+        """
+        normalized = "|".join(
+            _WHITESPACE_RE.sub(" ", str(part)).strip().lower() for part in parts
+        )
+        return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for the key, or None on a miss."""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        """Store a response, evicting the least recently used entry if full."""
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+
+class DiskCache:
+    """SQLite-backed key/value cache shared across processes and restarts."""
+
+    def __init__(self, db_path: str, ttl: float = 7 * 24 * 3600):
+        """
+        Initialize the disk cache.
+
+        Args:
+            db_path: Path to the SQLite database file
+            ttl: Time-to-live of cached entries (in seconds)
+        """
+        self.ttl = ttl
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(db_path, timeout=10, check_same_thread=False)
+        # WAL lets several worker processes read while one writes
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS response_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                expires REAL NOT NULL
+            )
+        """)
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached value for the key, or None if missing or expired."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM response_cache WHERE key = ? AND expires > ?",
+                (key, time.time())
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, value: str) -> None:
+        """Store a value and drop expired entries."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("DELETE FROM response_cache WHERE expires <= ?", (now,))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO response_cache (key, value, expires) VALUES (?, ?, ?)",
+                (key, value, now + self.ttl)
+            )
+            self._conn.commit()
+
+
+class SemanticCache:
+    """Embedding-keyed response cache backed by SQLite."""
+
+    def __init__(self,
+                 db_path: str,
+                 embed_fn: Callable[[str], List[float]],
+                 threshold: float = 0.92,
+                 ttl: float = 3600):
+        """
+        Initialize the semantic cache.
+
+        Args:
+            db_path: Path to the SQLite database file
+            embed_fn: Function that turns a text into an embedding vector
+            threshold: Minimum cosine similarity for a cache hit
+            ttl: Time-to-live of cached entries (in seconds)
+        """
+        self.embed_fn = embed_fn
+        self.threshold = threshold
+        self.ttl = ttl
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(db_path, timeout=10, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS semantic_cache (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                namespace TEXT NOT NULL,
+                system_hash TEXT NOT NULL,
+                embedding BLOB NOT NULL,
+                completion TEXT NOT NULL,
+                ts REAL NOT NULL,
+                ttl REAL NOT NULL
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_semantic_ns ON semantic_cache (namespace, system_hash)"
+        )
+        self._conn.commit()
+
+    def lookup(self,
+               namespace: str,
+               system_prompt: str,
+               text: str,
+               threshold: Optional[float] = None) -> Tuple[Optional[str], Optional[array]]:
+        """
+        Look up the most similar cached completion.
+
+        Args:
+            namespace: Cache namespace (e.g. destination/itinerary/checklist)
+            system_prompt: System prompt of the request
+            text: Text to embed and compare
+            threshold: Similarity threshold for this lookup (overrides the default)
+
+        Returns:
+            Tuple of (cached completion or None, embedding of the text).
+            The embedding is None if embedding or the database read failed,
+            in which case the caller should not store the result either.
+        """
+        try:
+            embedding = _normalize(self.embed_fn(text))
+        except Exception:
+            return None, None
+
+        # Read-only, so lookups never hold a write lock; store() prunes
+        try:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT embedding, completion FROM semantic_cache "
+                    "WHERE namespace = ? AND system_hash = ? AND ts + ttl >= ?",
+                    (namespace, _hash_text(system_prompt), time.time())
+                ).fetchall()
+        except sqlite3.Error:
+            return None, None
+
+        best_score, best_completion = 0.0, None
+        for blob, completion in rows:
+            score = _dot(embedding, array("f", blob))
+            if score > best_score:
+                best_score, best_completion = score, completion
+
+        if best_score >= (self.threshold if threshold is None else threshold):
+            return best_completion, embedding
+        return None, embedding
+
+    def store(self,
+              namespace: str,
+              system_prompt: str,
+              embedding: array,
+              completion: str) -> None:
+        """
+        Store a completion under the given embedding.
+
+        Args:
+            namespace: Cache namespace
+            system_prompt: System prompt of the request
+            embedding: Normalized embedding returned by lookup()
+            completion: Completion text to cache
+        """
+        now = time.time()
+        with self._lock:
+            try:
+                self._conn.execute("DELETE FROM semantic_cache WHERE ts + ttl < ?", (now,))
+                self._conn.execute(
+                    "INSERT INTO semantic_cache (namespace, system_hash, embedding, completion, ts, ttl) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (namespace, _hash_text(system_prompt), embedding.tobytes(), completion, now, self.ttl)
+                )
+                self._conn.commit()
+            except sqlite3.Error:
+                # A cache that cannot be written only loses the hit
+                self._conn.rollback()
+
+
+def _hash_text(text: str) -> str:
+    """Return the SHA-256 hex digest of a text."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _normalize(vector: List[float]) -> array:
+    """L2-normalize a vector so cosine similarity becomes a dot product."""
+    norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+    return array("f", (x / norm for x in vector))
+
+
+def _dot(a: array, b: array) -> float:
+    """Dot product of two equally sized vectors."""
+    if len(a) != len(b):
+        return 0.0
+    return math.fsum(x * y for x, y in zip(a, b))
@@ -4,6 +4,7 @@ Contains all configuration constants and settings.
 """
 
 import os
+import tempfile
 from typing import List, Dict
 
 # API Configuration
@@ -12,6 +13,34 @@ API_BASE = "https://api-inference.modelscope.cn/v1/"
 MODEL_NAME = "deepseek-ai/DeepSeek-V3.2-Exp"
 MAX_TOKENS = 4096
 TEMPERATURE = 0.7
+API_MAX_ATTEMPTS = 5  # 限流或网络错误时的最大尝试次数
+RETRY_INITIAL_DELAY = 1.0  # 首次重试等待（秒）
+RETRY_MAX_DELAY = 30.0  # 重试等待上限（秒）
+API_TIMEOUT = 120.0  # 单次请求超时（秒），长回复需要较长时间
+API_CONNECT_TIMEOUT = 5.0  # 建立连接超时（秒）
+API_MAX_CONNECTIONS = 32  # 连接池最大连接数
+API_MAX_KEEPALIVE_CONNECTIONS = 16  # 保持长连接的最大数量
+
+# Per-stage models, all MODEL_NAME unless set. The checklist is a structured-extraction
+# task, so a smaller model (e.g. Qwen/Qwen2.5-7B-Instruct) can be configured for it.
+DESTINATION_MODEL_NAME = os.getenv("DESTINATION_MODEL_NAME", MODEL_NAME)
+ITINERARY_MODEL_NAME = os.getenv("ITINERARY_MODEL_NAME", MODEL_NAME)
+CHECKLIST_MODEL_NAME = os.getenv("CHECKLIST_MODEL_NAME", MODEL_NAME)
+CHECKLIST_JSON_MODE = os.getenv("CHECKLIST_JSON_MODE", "0") == "1"  # 清单阶段请求JSON输出格式（需接口支持response_format）
+
+# Cache Configuration
+EXACT_CACHE_SIZE = 512  # 精确匹配缓存条目上限
+CACHE_DIR = os.getenv("CACHE_DIR", os.path.join(tempfile.gettempdir(), "travel_assistant_cache"))
+DISK_CACHE_TTL = 7 * 24 * 3600  # 磁盘缓存有效期（秒）
+EMBEDDING_MODEL_NAME = os.getenv("EMBEDDING_MODEL_NAME", "")  # 留空则不启用语义缓存
+SEMANTIC_CACHE_THRESHOLD = 0.92  # 余弦相似度阈值
+SEMANTIC_CACHE_TTL = 3600  # 语义缓存有效期（秒）
+NO_CACHE_PATTERN = r"今天|现在|此刻|当前|实时|最新"  # 含时效性词语的请求不走缓存
+LLM_CACHE_PATH = os.path.join(CACHE_DIR, "llm_cache.sqlite3")  # 生成结果缓存
+LLM_CACHE_MAX_ENTRIES = 1000  # 生成结果缓存条目上限
+LLM_CACHE_TTL = DISK_CACHE_TTL  # 生成结果缓存有效期（秒）
+LLM_SEMANTIC_CACHE_PATH = os.path.join(CACHE_DIR, "llm_semantic_cache.sqlite3")  # 生成结果语义缓存
+LLM_SEMANTIC_THRESHOLD = 0.93  # 生成结果语义缓存相似度阈值
 
 # Application Settings
 APP_TITLE = "🧳 银发族智能旅行助手"
@@ -4,6 +4,8 @@ from .travel_functions import (
     generate_destination_recommendation,
     generate_itinerary_plan,
     generate_checklist,
+    agenerate_all,
+    generate_all,
 )
 from .video_editor import (
     create_video_from_images,
@@ -14,6 +16,8 @@ __all__ = [
     'generate_destination_recommendation',
     'generate_itinerary_plan',
     'generate_checklist',
+    'agenerate_all',
+    'generate_all',
     'create_video_from_images',
     'validate_media_files'
 ]
\ No newline at end of file
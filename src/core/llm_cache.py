@@ -0,0 +1,314 @@
+"""
+LLM result cache module for the travel assistant application.
+Caches the formatted output of the travel functions so repeated inputs skip
+the remote model entirely.
+"""
+
+import functools
+import hashlib
+import inspect
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+import zlib
+from typing import Any, Callable, Optional, Tuple
+try:
+    import orjson
+except ImportError:  # Optional speedup, the standard library encoder is used otherwise
+    orjson = None
+try:
+    from ..config.config import (
+        LLM_CACHE_PATH, LLM_CACHE_MAX_ENTRIES, LLM_CACHE_TTL, LLM_SEMANTIC_CACHE_PATH,
+        EMBEDDING_MODEL_NAME, SEMANTIC_CACHE_TTL, NO_CACHE_PATTERN
+    )
+    from ..api.openai_client import get_client
+    from ..api.response_cache import SemanticCache
+except ImportError:
+    import sys
+    _SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if _SRC_DIR not in sys.path:
+        sys.path.insert(0, _SRC_DIR)
+    from config.config import (
+        LLM_CACHE_PATH, LLM_CACHE_MAX_ENTRIES, LLM_CACHE_TTL, LLM_SEMANTIC_CACHE_PATH,
+        EMBEDDING_MODEL_NAME, SEMANTIC_CACHE_TTL, NO_CACHE_PATTERN
+    )
+    from api.openai_client import get_client
+    from api.response_cache import SemanticCache
+
+# Requests containing time-sensitive words are never answered from the cache
+_NO_CACHE_RE = re.compile(NO_CACHE_PATTERN)
+
+# A broken cache database only costs hits, so these errors are logged and ignored
+_CACHE_ERRORS = (sqlite3.Error, OSError, zlib.error)
+
+_logger = logging.getLogger(__name__)
+
+
+class LLMCache:
+    """SQLite-backed LRU cache of compressed results with expiry."""
+
+    def __init__(self, db_path: str, max_entries: int = 1000, ttl: float = 7 * 24 * 3600):
+        """
+        Initialize the cache. The database is opened on first use.
+
+        Args:
+            db_path: Path to the SQLite database file
+            max_entries: Maximum number of cached results
+            ttl: Time-to-live of cached results (in seconds)
+        """
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database and create the table if needed."""
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=10, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(llm_cache)")}
+            if columns and "expires" not in columns:
+                # Results cached before expiry was tracked would never expire
+                conn.execute("DROP TABLE llm_cache")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    value BLOB NOT NULL,
+                    ts INTEGER NOT NULL,
+                    expires REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_ts ON llm_cache (ts)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _rollback(self) -> None:
+        """End a failed transaction so the connection does not keep its locks."""
+        if self._conn is not None:
+            try:
+                self._conn.rollback()
+            except sqlite3.Error:
+                pass
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached result for the key, or None if missing, expired or unreadable."""
+        with self._lock:
+            try:
+                conn = self._connect()
+                row = conn.execute(
+                    "SELECT value FROM llm_cache WHERE key = ? AND expires > ?", (key, time.time())
+                ).fetchone()
+                if row is None:
+                    return None
+                # Refresh the entry so eviction drops the least recently used ones
+                conn.execute("UPDATE llm_cache SET ts = ? WHERE key = ?", (time.time_ns(), key))
+                conn.commit()
+                return zlib.decompress(row[0]).decode("utf-8")
+            except _CACHE_ERRORS as e:
+                self._rollback()
+                _logger.warning("读取生成结果缓存失败: %s", e)
+                return None
+
+    def set(self, key: str, value: str) -> None:
+        """Store a result, dropping expired entries and the least recently used beyond max_entries."""
+        blob = zlib.compress(value.encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            try:
+                conn = self._connect()
+                conn.execute("DELETE FROM llm_cache WHERE expires <= ?", (now,))
+                conn.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, value, ts, expires) VALUES (?, ?, ?, ?)",
+                    (key, blob, time.time_ns(), now + self.ttl)
+                )
+                conn.execute(
+                    "DELETE FROM llm_cache WHERE key IN "
+                    "(SELECT key FROM llm_cache ORDER BY ts DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,)
+                )
+                conn.commit()
+            except _CACHE_ERRORS as e:
+                # The caller already has its result; only the cache entry is lost
+                self._rollback()
+                _logger.warning("写入生成结果缓存失败: %s", e)
+
+
+_cache = LLMCache(LLM_CACHE_PATH, LLM_CACHE_MAX_ENTRIES, LLM_CACHE_TTL)
+_semantic_cache = None
+
+
+def _get_semantic_cache() -> Optional[SemanticCache]:
+    """Return the shared semantic cache, or None if no embedding model is configured."""
+    global _semantic_cache
+    if _semantic_cache is None and EMBEDDING_MODEL_NAME:
+        try:
+            _semantic_cache = SemanticCache(
+                LLM_SEMANTIC_CACHE_PATH,
+                embed_fn=lambda text: get_client().embed_text(text),
+                ttl=SEMANTIC_CACHE_TTL
+            )
+        except _CACHE_ERRORS as e:
+            _logger.warning("打开语义缓存失败: %s", e)
+    return _semantic_cache
+
+
+def _normalize(value: Any) -> Any:
+    """Normalize an argument so equivalent inputs produce the same key."""
+    if isinstance(value, str):
+        return unicodedata.normalize("NFC", value).strip().lower()
+    if isinstance(value, (list, tuple, set)):
+        # Order of selected options does not change the request
+        return sorted(_normalize(item) for item in value)
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in value.items()}
+    return value
+
+
+def make_key(namespace: str, arguments: dict) -> str:
+    """
+    Build the cache key for a call.
+
+    Args:
+        namespace: Cache namespace of the decorated function
+        arguments: Bound call arguments
+
+    Returns:
+        SHA-256 hex digest of the normalized arguments
+    """
+    payload = {"ns": namespace, "args": _normalize(arguments)}
+    if orjson is not None:
+        encoded = orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)
+    else:
+        # Same compact UTF-8 output as orjson, so keys match either way
+        encoded = json.dumps(
+            payload, sort_keys=True, ensure_ascii=False, separators=(",", ":")
+        ).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def _is_time_sensitive(value: Any) -> bool:
+    """Whether any text in the arguments asks for current information."""
+    if isinstance(value, str):
+        return _NO_CACHE_RE.search(value) is not None
+    if isinstance(value, (list, tuple, set)):
+        return any(_is_time_sensitive(item) for item in value)
+    if isinstance(value, dict):
+        return any(_is_time_sensitive(item) for item in value.values())
+    return False
+
+
+def _embedding_text(arguments: dict) -> str:
+    """Join the normalized argument values into the text that gets embedded."""
+    values = []
+    for value in _normalize(arguments).values():
+        values.append("、".join(map(str, value)) if isinstance(value, list) else str(value))
+    return "|".join(values)
+
+
+def cached_llm(namespace: str,
+               semantic_threshold: Optional[float] = None,
+               semantic_fields: Tuple[str, ...] = ()) -> Callable:
+    """
+    Cache the string result of a function calling the model.
+
+    Only successful, non-empty results are cached: if the function raises,
+    nothing is stored. Results expire after LLM_CACHE_TTL, and calls whose
+    arguments contain time-sensitive words (NO_CACHE_PATTERN) are neither
+    looked up nor stored. The wrapper also exposes lookup(*args),
+    store(result, *args) and discard(*args) for callers that produce the
+    same result another way (e.g. streaming); such a caller must call
+    discard() if it fails before storing.
+
+    Args:
+        namespace: Cache namespace so different functions never share entries
+        semantic_threshold: If set, an exact miss falls back to the semantic
+            cache and returns a result whose semantic_fields embed with at
+            least this cosine similarity (needs EMBEDDING_MODEL_NAME)
+        semantic_fields: Names of the free-text arguments that are embedded.
+            All other arguments must match exactly, so e.g. a different
+            destination never returns another city's result. The semantic
+            cache is not used without them.
+
+    Returns:
+        The decorator
+    """
+    def decorator(func: Callable[..., str]) -> Callable[..., str]:
+        signature = inspect.signature(func)
+        # Embeddings computed on a miss, kept until the result is stored
+        pending_embeddings = {}
+        use_semantic = semantic_threshold is not None and bool(semantic_fields)
+
+        def bind(*args, **kwargs) -> dict:
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return dict(bound.arguments)
+
+        def partition(arguments: dict) -> str:
+            # Discrete arguments are hashed into the partition the semantic cache matches in
+            discrete = {k: v for k, v in arguments.items() if k not in semantic_fields}
+            return make_key(func.__qualname__, discrete)
+
+        def lookup(*args, **kwargs) -> Optional[str]:
+            arguments = bind(*args, **kwargs)
+            if _is_time_sensitive(arguments):
+                return None
+            key = make_key(namespace, arguments)
+            cached = _cache.get(key)
+            if cached is not None or not use_semantic:
+                return cached
+
+            semantic_cache = _get_semantic_cache()
+            if semantic_cache is None:
+                return None
+            cached, embedding = semantic_cache.lookup(
+                namespace, partition(arguments),
+                _embedding_text({name: arguments[name] for name in semantic_fields}),
+                semantic_threshold
+            )
+            if cached is not None:
+                _cache.set(key, cached)
+            elif embedding is not None:
+                pending_embeddings[key] = embedding
+            return cached
+
+        def store(result: str, *args, **kwargs) -> None:
+            arguments = bind(*args, **kwargs)
+            key = make_key(namespace, arguments)
+            embedding = pending_embeddings.pop(key, None)
+            if not result or _is_time_sensitive(arguments):
+                return
+            _cache.set(key, result)
+            if embedding is not None:
+                _get_semantic_cache().store(namespace, partition(arguments), embedding, result)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs) -> str:
+            cached = lookup(*args, **kwargs)
+            if cached is not None:
+                return cached
+
+            try:
+                result = func(*args, **kwargs)
+            except Exception:
+                discard(*args, **kwargs)
+                raise
+            store(result, *args, **kwargs)
+            return result
+
+        def discard(*args, **kwargs) -> None:
+            pending_embeddings.pop(make_key(namespace, bind(*args, **kwargs)), None)
+
+        wrapper.lookup = lookup
+        wrapper.store = store
+        wrapper.discard = discard
+        return wrapper
+
+    return decorator
\ No newline at end of file
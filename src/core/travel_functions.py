@@ -3,19 +3,82 @@ Core travel functions module for the travel assistant application.
 Contains the main business logic for travel planning functionality.
 """
 
-import json
-from typing import List, Dict, Any
+import asyncio
+from typing import List, Dict, Any, Iterator, Optional
 try:
+    from ..config.config import LLM_SEMANTIC_THRESHOLD
     from ..api.openai_client import get_client
+    from .llm_cache import cached_llm
     from ..utils.helpers import clean_response, validate_inputs, safe_json_parse, format_interests, format_health_focus, is_valid_chinese_location
 except ImportError:
     import sys
     import os
-    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    _SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if _SRC_DIR not in sys.path:
+        sys.path.insert(0, _SRC_DIR)
+    from config.config import LLM_SEMANTIC_THRESHOLD
     from api.openai_client import get_client
+    from core.llm_cache import cached_llm
     from utils.helpers import clean_response, validate_inputs, safe_json_parse, format_interests, format_health_focus, is_valid_chinese_location
 
 
+# Checklist HTML fragments, rendered once per section rather than built by concatenation
+_CHECKLIST_HTML_HEADER = """
+    <div style="font-family: 'Segoe UI', 'Microsoft YaHei', sans-serif; max-width: 800px; margin: 0 auto; background: #fafafa; padding: 20px; border-radius: 15px;">
+        <div style="text-align: center; margin-bottom: 30px;">
+            <h1 style="color: #2c3e50; font-size: 32px; margin-bottom: 10px;">🎁 专属旅行清单</h1>
+            <p style="color: #7f8c8d; font-size: 16px;">为您的旅行做好充分准备</p>
+        </div>
+    """
+
+_CHECKLIST_HTML_FOOTER = """
+        <div style="background: #f5f5f5; padding: 15px; border-radius: 8px; text-align: center; color: #666; font-size: 13px; margin-top: 20px;">
+            <p style="margin: 5px 0;">💡 此清单仅供参考，请根据实际情况调整</p>
+        </div>
+    </div>
+    """
+
+# (data key, title, background color, title color) of each checklist section, in display order
+_CHECKLIST_SECTIONS = (
+    ("documents", "📄 证件类", "#e8f4fd", "#2980b9"),
+    ("clothing", "👕 衣物类", "#fef9e7", "#f39c12"),
+    ("medications", "💊 药品类", "#ffe6e6", "#e74c3c"),
+    ("daily_items", "🧴 生活用品类", "#e8f8f5", "#27ae60"),
+    ("electronics", "📱 电子设备类", "#f0f3f4", "#95a5a6"),
+    ("financial", "💰 财务准备", "#eafaf1", "#2ecc71"),
+    ("safety", "🛡️ 安全用品", "#fadbd8", "#c0392b"),
+    ("entertainment", "🎮 娱乐用品", "#e8daef", "#8e44ad"),
+    ("special_items", "⭐ 特殊用品", "#fdedec", "#e91e63"),
+)
+
+_SECTION_TEMPLATE = """
+    <div style="background: {bg_color}; padding: 20px; border-radius: 10px; margin-bottom: 15px; border-left: 5px solid {title_color};">
+        <h3 style="margin: 0 0 15px 0; color: {title_color}; font-size: 20px;">{title}</h3>
+        <ul style="margin: 0; padding-left: 20px; color: #555;">
+    {items}
+        </ul>
+    </div>
+    """
+_SECTION_ITEM_TEMPLATE = '<li style="margin-bottom: 8px; line-height: 1.6;">{}</li>'
+
+_BOOKING_GUIDES_HEADER = """
+    <div style="background: #fff3e0; padding: 20px; border-radius: 10px; margin-bottom: 15px; border-left: 5px solid #e65100;">
+        <h3 style="margin: 0 0 15px 0; color: #e65100; font-size: 20px;">🎫 预订指南</h3>
+    """
+_BOOKING_GUIDE_TITLE_TEMPLATE = '<h4 style="color: #f57c00; margin: 10px 0 5px 0;">{}</h4>'
+_BOOKING_PLATFORM_TEMPLATE = '<li style="margin-bottom: 5px;">{}</li>'
+
+_TIPS_HEADER = """
+    <div style="background: #fff3e0; padding: 20px; border-radius: 10px; margin-bottom: 15px; border-left: 5px solid #e65100;">
+        <h3 style="margin: 0 0 15px 0; color: #e65100; font-size: 20px;">💡 温馨提示</h3>
+    """
+_TIP_TEMPLATE = '<p style="margin: 8px 0; color: #555; line-height: 1.6;">• {}</p>'
+
+_SECTION_END = """
+    </div>
+    """
+
+
 def generate_destination_recommendation(season: str, 
                                        health_status: str, 
                                        budget: str, 
@@ -43,24 +106,33 @@ def generate_destination_recommendation(season: str,
     if errors:
         return f"输入验证失败: {', '.join(errors.values())}"
     
-    # Format interests
-    interests_str = format_interests(interests)
-    
     try:
-        client = get_client()
-        response = client.generate_destination_recommendations(
-            season=season,
-            health_status=health_status,
-            budget=budget,
-            interests=interests_str
-        )
-        
-        return clean_response(response)
+        return _render_destination_recommendation(season, health_status, budget, interests)
         
     except Exception as e:
         return f"抱歉，生成推荐时出现了错误: {str(e)}"
 
 
+@cached_llm("destination", semantic_threshold=LLM_SEMANTIC_THRESHOLD, semantic_fields=("interests",))
+def _render_destination_recommendation(season: str, 
+                                       health_status: str, 
+                                       budget: str, 
+                                       interests: List[str]) -> str:
+    """Call the model for destination recommendations and clean the response."""
+    # Format interests
+    interests_str = format_interests(interests)
+    
+    client = get_client()
+    response = client.generate_destination_recommendations(
+        season=season,
+        health_status=health_status,
+        budget=budget,
+        interests=interests_str
+    )
+    
+    return clean_response(response)
+
+
 def generate_itinerary_plan(destination: str, 
                            duration: str, 
                            mobility: str, 
@@ -77,7 +149,97 @@ def generate_itinerary_plan(destination: str,
     Returns:
         Formatted itinerary plan
     """
-    # Validate inputs
+    error = _validate_itinerary_inputs(destination, duration, mobility)
+    if error:
+        return error
+    
+    try:
+        return _render_itinerary_plan(destination, duration, mobility, health_focus)
+        
+    except Exception as e:
+        return f"抱歉，制定行程时出现了错误: {str(e)}"
+
+
+@cached_llm("itinerary", semantic_threshold=LLM_SEMANTIC_THRESHOLD, semantic_fields=("health_focus",))
+def _render_itinerary_plan(destination: str, 
+                           duration: str, 
+                           mobility: str, 
+                           health_focus: List[str]) -> str:
+    """Call the model for an itinerary plan and clean the response."""
+    # Format health focus
+    health_focus_str = format_health_focus(health_focus)
+    
+    client = get_client()
+    response = client.generate_itinerary_plan(
+        destination=destination,
+        duration=duration,
+        mobility=mobility,
+        health_focus=health_focus_str
+    )
+    
+    return clean_response(response)
+
+
+def stream_itinerary_plan(destination: str, 
+                          duration: str, 
+                          mobility: str, 
+                          health_focus: List[str]) -> Iterator[str]:
+    """
+    Generate a detailed itinerary plan, yielding it while it is generated.
+    
+    Args:
+        destination: Travel destination
+        duration: Trip duration
+        mobility: Mobility status
+        health_focus: List of health concerns
+        
+    Yields:
+        The formatted itinerary plan received so far
+    """
+    error = _validate_itinerary_inputs(destination, duration, mobility)
+    if error:
+        yield error
+        return
+    
+    try:
+        # Share results with generate_itinerary_plan()
+        cached = _render_itinerary_plan.lookup(destination, duration, mobility, health_focus)
+        if cached is not None:
+            yield cached
+            return
+        
+        # Format health focus
+        health_focus_str = format_health_focus(health_focus)
+        
+        client = get_client()
+        # Fragments are shown raw; cleaning the whole text on every fragment
+        # would make a long itinerary quadratic, so it is cleaned once at the end
+        text = ""
+        for fragment in client.generate_itinerary_plan(
+            destination=destination,
+            duration=duration,
+            mobility=mobility,
+            health_focus=health_focus_str,
+            stream=True
+        ):
+            text += fragment
+            yield text
+        
+        result = clean_response(text)
+        if result != text:
+            yield result
+        if result:
+            _render_itinerary_plan.store(result, destination, duration, mobility, health_focus)
+        
+    except Exception as e:
+        yield f"抱歉，制定行程时出现了错误: {str(e)}"
+    finally:
+        # Drop the embedding kept by lookup() if the stream failed or was closed early
+        _render_itinerary_plan.discard(destination, duration, mobility, health_focus)
+
+
+def _validate_itinerary_inputs(destination: str, duration: str, mobility: str) -> Optional[str]:
+    """Validate itinerary inputs, returning an error message or None if valid."""
     inputs = {
         'destination': destination,
         'duration': duration,
@@ -92,22 +254,7 @@ def generate_itinerary_plan(destination: str,
     if not is_valid_chinese_location(destination):
         return "请输入有效的中文地名"
     
-    # Format health focus
-    health_focus_str = format_health_focus(health_focus)
-    
-    try:
-        client = get_client()
-        response = client.generate_itinerary_plan(
-            destination=destination,
-            duration=duration,
-            mobility=mobility,
-            health_focus=health_focus_str
-        )
-        
-        return clean_response(response)
-        
-    except Exception as e:
-        return f"抱歉，制定行程时出现了错误: {str(e)}"
+    return None
 
 
 def generate_checklist(origin: str, 
@@ -147,27 +294,90 @@ def generate_checklist(origin: str,
         return "请输入有效的目的地名称"
     
     try:
-        client = get_client()
-        response = client.generate_checklist(
-            origin=origin,
-            destination=destination,
-            duration=duration,
-            special_needs=special_needs,
-            itinerary_text=itinerary_text
-        )
-        
-        # Parse JSON response and format as HTML
-        checklist_data = safe_json_parse(response)
-        if checklist_data:
-            return format_checklist_html(checklist_data)
-        else:
-            # Fallback to text formatting
-            return format_checklist_text(response)
+        return _render_checklist(origin, destination, duration, special_needs, itinerary_text)
         
     except Exception as e:
         return f"抱歉，生成清单时出现了错误: {str(e)}"
 
 
+@cached_llm("checklist")
+def _render_checklist(origin: str, 
+                      destination: str, 
+                      duration: str, 
+                      special_needs: str,
+                      itinerary_text: str = "") -> str:
+    """Call the model for a checklist and format it as HTML."""
+    client = get_client()
+    response = client.generate_checklist(
+        origin=origin,
+        destination=destination,
+        duration=duration,
+        special_needs=special_needs,
+        itinerary_text=itinerary_text
+    )
+    
+    # Parse JSON response and format as HTML
+    checklist_data = safe_json_parse(response)
+    if checklist_data:
+        return format_checklist_html(checklist_data)
+    else:
+        # Fallback to text formatting
+        return format_checklist_text(response)
+
+
+async def agenerate_all(season: str,
+                        health_status: str,
+                        budget: str,
+                        interests: List[str],
+                        origin: str,
+                        destination: str,
+                        duration: str,
+                        mobility: str,
+                        health_focus: List[str],
+                        special_needs: str = "") -> Dict[str, str]:
+    """
+    Generate recommendations, itinerary and checklist for one session concurrently.
+    
+    The destination recommendations and the itinerary do not depend on each
+    other and are generated at the same time; the checklist then uses the
+    itinerary as context.
+    
+    Args:
+        season: Travel season
+        health_status: Health status
+        budget: Budget range
+        interests: List of interests
+        origin: Departure location
+        destination: Travel destination
+        duration: Trip duration
+        mobility: Mobility status
+        health_focus: List of health concerns
+        special_needs: Special requirements
+        
+    Returns:
+        Dict with the "destination", "itinerary" and "checklist" results
+    """
+    # The sync functions share the client connection pool and the result cache
+    recommendation, itinerary = await asyncio.gather(
+        asyncio.to_thread(generate_destination_recommendation, season, health_status, budget, interests),
+        asyncio.to_thread(generate_itinerary_plan, destination, duration, mobility, health_focus)
+    )
+    checklist = await asyncio.to_thread(
+        generate_checklist, origin, destination, duration, special_needs, itinerary
+    )
+    
+    return {
+        "destination": recommendation,
+        "itinerary": itinerary,
+        "checklist": checklist
+    }
+
+
+def generate_all(*args, **kwargs) -> Dict[str, str]:
+    """Synchronous wrapper around agenerate_all()."""
+    return asyncio.run(agenerate_all(*args, **kwargs))
+
+
 def format_checklist_html(data: Dict[str, Any]) -> str:
     """
     Format checklist data as HTML.
@@ -178,139 +388,58 @@ def format_checklist_html(data: Dict[str, Any]) -> str:
     Returns:
         HTML formatted checklist
     """
-    html = """
-    <div style="font-family: 'Segoe UI', 'Microsoft YaHei', sans-serif; max-width: 800px; margin: 0 auto; background: #fafafa; padding: 20px; border-radius: 15px;">
-        <div style="text-align: center; margin-bottom: 30px;">
-            <h1 style="color: #2c3e50; font-size: 32px; margin-bottom: 10px;">🎁 专属旅行清单</h1>
-            <p style="color: #7f8c8d; font-size: 16px;">为您的旅行做好充分准备</p>
-        </div>
-    """
-    
-    # Document checklist
-    documents = data.get("documents", [])
-    if documents:
-        html += create_checklist_section("📄 证件类", documents, "#e8f4fd", "#2980b9")
-    
-    # Clothing checklist
-    clothing = data.get("clothing", [])
-    if clothing:
-        html += create_checklist_section("👕 衣物类", clothing, "#fef9e7", "#f39c12")
-    
-    # Medications checklist
-    medications = data.get("medications", [])
-    if medications:
-        html += create_checklist_section("💊 药品类", medications, "#ffe6e6", "#e74c3c")
-    
-    # Daily items checklist
-    daily_items = data.get("daily_items", [])
-    if daily_items:
-        html += create_checklist_section("🧴 生活用品类", daily_items, "#e8f8f5", "#27ae60")
-    
-    # Electronics checklist
-    electronics = data.get("electronics", [])
-    if electronics:
-        html += create_checklist_section("📱 电子设备类", electronics, "#f0f3f4", "#95a5a6")
-    
-    # Financial checklist
-    financial = data.get("financial", [])
-    if financial:
-        html += create_checklist_section("💰 财务准备", financial, "#eafaf1", "#2ecc71")
+    parts = [_CHECKLIST_HTML_HEADER]
     
-    # Safety checklist
-    safety = data.get("safety", [])
-    if safety:
-        html += create_checklist_section("🛡️ 安全用品", safety, "#fadbd8", "#c0392b")
-    
-    # Entertainment checklist
-    entertainment = data.get("entertainment", [])
-    if entertainment:
-        html += create_checklist_section("🎮 娱乐用品", entertainment, "#e8daef", "#8e44ad")
-    
-    # Special items checklist
-    special_items = data.get("special_items", [])
-    if special_items:
-        html += create_checklist_section("⭐ 特殊用品", special_items, "#fdedec", "#e91e63")
+    for key, title, bg_color, title_color in _CHECKLIST_SECTIONS:
+        items = data.get(key, [])
+        if items:
+            parts.append(create_checklist_section(title, items, bg_color, title_color))
     
     # Booking guides
     booking_guides = data.get("booking_guides", {})
     if booking_guides:
-        html += create_booking_guides_section(booking_guides)
+        parts.append(create_booking_guides_section(booking_guides))
     
     # Tips
     tips = data.get("tips", [])
     if tips:
-        html += create_tips_section(tips)
+        parts.append(create_tips_section(tips))
     
-    # Footer
-    html += """
-        <div style="background: #f5f5f5; padding: 15px; border-radius: 8px; text-align: center; color: #666; font-size: 13px; margin-top: 20px;">
-            <p style="margin: 5px 0;">💡 此清单仅供参考，请根据实际情况调整</p>
-        </div>
-    </div>
-    """
-    
-    return html
+    parts.append(_CHECKLIST_HTML_FOOTER)
+    return "".join(parts)
 
 
 def create_checklist_section(title: str, items: List[str], bg_color: str, title_color: str) -> str:
     """Create a checklist section HTML."""
-    html = f"""
-    <div style="background: {bg_color}; padding: 20px; border-radius: 10px; margin-bottom: 15px; border-left: 5px solid {title_color};">
-        <h3 style="margin: 0 0 15px 0; color: {title_color}; font-size: 20px;">{title}</h3>
-        <ul style="margin: 0; padding-left: 20px; color: #555;">
-    """
-    
-    for item in items:
-        html += f'<li style="margin-bottom: 8px; line-height: 1.6;">{item}</li>'
-    
-    html += """
-        </ul>
-    </div>
-    """
-    
-    return html
+    return _SECTION_TEMPLATE.format(
+        bg_color=bg_color,
+        title_color=title_color,
+        title=title,
+        items="".join(_SECTION_ITEM_TEMPLATE.format(item) for item in items)
+    )
 
 
 def create_booking_guides_section(booking_guides: Dict[str, Any]) -> str:
     """Create booking guides section HTML."""
-    html = """
-    <div style="background: #fff3e0; padding: 20px; border-radius: 10px; margin-bottom: 15px; border-left: 5px solid #e65100;">
-        <h3 style="margin: 0 0 15px 0; color: #e65100; font-size: 20px;">🎫 预订指南</h3>
-    """
+    parts = [_BOOKING_GUIDES_HEADER]
     
     for category, info in booking_guides.items():
         if isinstance(info, dict):
-            html += f'<h4 style="color: #f57c00; margin: 10px 0 5px 0;">{info.get("title", category)}</h4>'
+            parts.append(_BOOKING_GUIDE_TITLE_TEMPLATE.format(info.get("title", category)))
             
             platforms = info.get('platforms', [])
             if platforms:
-                html += '<ul style="margin: 5px 0; padding-left: 20px; color: #555;">'
-                for platform in platforms:
-                    html += f'<li style="margin-bottom: 5px;">{platform}</li>'
-                html += '</ul>'
+                parts.append('<ul style="margin: 5px 0; padding-left: 20px; color: #555;">')
+                parts.extend(_BOOKING_PLATFORM_TEMPLATE.format(platform) for platform in platforms)
+                parts.append('</ul>')
     
-    html += """
-    </div>
-    """
-    
-    return html
+    parts.append(_SECTION_END)
+    return "".join(parts)
 
 
 def create_tips_section(tips: List[str]) -> str:
     """Create tips section HTML."""
-    html = """
-    <div style="background: #fff3e0; padding: 20px; border-radius: 10px; margin-bottom: 15px; border-left: 5px solid #e65100;">
-        <h3 style="margin: 0 0 15px 0; color: #e65100; font-size: 20px;">💡 温馨提示</h3>
-    """
-    
-    for tip in tips:
-        html += f'<p style="margin: 8px 0; color: #555; line-height: 1.6;">• {tip}</p>'
-    
-    html += """
-    </div>
-    """
-    
-    return html
+    return _TIPS_HEADER + "".join(_TIP_TEMPLATE.format(tip) for tip in tips) + _SECTION_END
 
 
 def format_checklist_text(response: str) -> str:
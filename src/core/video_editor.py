@@ -3,11 +3,36 @@ Video editor module for the travel assistant application.
 Contains functions for creating videos from images with audio and effects.
 """
 
+import functools
 import os
+import shutil
+import stat
+import subprocess
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Optional, Dict, Any
-import moviepy.editor as mpy
-from moviepy.video.fx.all import fadein, fadeout
+
+_MAX_STAT_WORKERS = 16
+
+# Length of the fade applied to each clip and to a single-image video (in seconds)
+_CLIP_FADE_DURATION = 0.5
+
+# How much larger than the frame the image is for the pan animation
+_PAN_SCALE = 1.2
+
+# Hardware H.264 encoders in order of preference, with their quality settings.
+# VAAPI is left out because it needs a render device and an hwupload step in
+# the filter graph, which would have to be set up per machine.
+_HW_CODEC_PARAMS = {
+    "h264_nvenc": ["-preset", "p4", "-tune", "hq", "-rc", "vbr", "-cq", "23", "-pix_fmt", "yuv420p"],
+    "h264_qsv": ["-global_quality", "23", "-pix_fmt", "nv12"],
+    "h264_videotoolbox": ["-q:v", "65", "-pix_fmt", "yuv420p"],
+}
+# A slideshow has next to no motion, so the slower presets' motion search buys little
+_SOFTWARE_CODEC_PARAMS = [
+    "-preset", "superfast", "-tune", "stillimage", "-crf", "23",
+    "-threads", str(os.cpu_count() or 1), "-pix_fmt", "yuv420p"
+]
 
 
 def validate_media_files(images: List[str], audio: Optional[str] = None) -> Dict[str, Any]:
@@ -27,18 +52,18 @@ def validate_media_files(images: List[str], audio: Optional[str] = None) -> Dict
     if not images:
         errors.append("请至少上传一张图片")
     else:
-        for img_path in images:
-            if not os.path.exists(img_path):
-                errors.append(f"图片文件不存在: {img_path}")
-            elif not os.path.isfile(img_path):
-                errors.append(f"不是有效的图片文件: {img_path}")
+        # One stat per file, issued concurrently for slow (network) filesystems
+        with ThreadPoolExecutor(max_workers=min(_MAX_STAT_WORKERS, len(images))) as pool:
+            errors.extend(error for error in pool.map(
+                lambda img_path: _check_media_file(img_path, "图片文件不存在", "不是有效的图片文件"),
+                images
+            ) if error)
     
     # Validate audio
     if audio:
-        if not os.path.exists(audio):
-            errors.append(f"音频文件不存在: {audio}")
-        elif not os.path.isfile(audio):
-            errors.append(f"不是有效的音频文件: {audio}")
+        error = _check_media_file(audio, "音频文件不存在", "不是有效的音频文件")
+        if error:
+            errors.append(error)
     
     return {
         'valid': len(errors) == 0,
@@ -46,6 +71,17 @@ def validate_media_files(images: List[str], audio: Optional[str] = None) -> Dict
     }
 
 
+def _check_media_file(path: str, missing_message: str, invalid_message: str) -> Optional[str]:
+    """Return an error message if the path is not an existing regular file, else None."""
+    try:
+        mode = os.stat(path).st_mode
+    except (OSError, ValueError):
+        return f"{missing_message}: {path}"
+    if not stat.S_ISREG(mode):
+        return f"{invalid_message}: {path}"
+    return None
+
+
 def create_video_from_images(
     images: List[str],
     audio: Optional[str] = None,
@@ -59,6 +95,10 @@ def create_video_from_images(
     """
     Create a video from images with optional audio, transitions, and animations.
     
+    The whole video is rendered by a single ffmpeg process: scaling,
+    animations, transitions and audio looping are expressed as one filter
+    graph, so no frame passes through Python.
+    
     Args:
         images: List of image file paths
         audio: Optional audio file path
@@ -76,109 +116,235 @@ def create_video_from_images(
         if not validation['valid']:
             raise ValueError(f"输入验证失败: {', '.join(validation['errors'])}")
         
-        # Create image clips with animations
-        image_clips = []
-        for i, img_path in enumerate(images):
-            # Create base image clip
-            clip = mpy.ImageClip(img_path)
-            
-            # Resize and crop to fit target dimensions (maintaining aspect ratio)
-            # First, resize the image to fit within target dimensions
-            clip = clip.resize(height=target_height) if clip.h < clip.w else clip.resize(width=target_width)
-            
-            # Then, center and crop if necessary
-            if clip.w > target_width:
-                x_center = clip.w // 2
-                y_center = clip.h // 2
-                clip = clip.crop(x_center=x_center, y_center=y_center, width=target_width, height=target_height)
-            
-            # Set duration for each clip
-            clip = clip.set_duration(duration_per_image)
-            
-            # Add animations based on selected type
-            if animation_type == "fade":
-                # Fade in and out
-                clip = clip.fx(fadein, 0.5)
-                clip = clip.fx(fadeout, 0.5)
-            elif animation_type == "zoom":
-                # Zoom in effect
-                clip = clip.resize(lambda t: 1 + 0.05 * t)  # Zoom in over time
-                clip = clip.set_position("center")
-            elif animation_type == "pan":
-                # Pan effect (slow movement)
-                clip = clip.resize(1.2)  # Resize to allow panning
-                def pan_position(t):
-                    # Move from left to right slowly
-                    return (int(100 * t), "center")
-                clip = clip.set_position(pan_position)
-            
-            image_clips.append(clip)
-        
-        # Add transitions between clips
-        if len(image_clips) > 1:
-            # Use concatenate_videoclips with transition effect
-            # First, we'll create a list of clips with fade out for all except last
-            clips_with_transitions = []
-            
-            for i, clip in enumerate(image_clips):
-                if i < len(image_clips) - 1:
-                    # Add fade out to all clips except the last one
-                    clip = clip.fx(fadeout, transition_duration)
-                clips_with_transitions.append(clip)
-            
-            # Concatenate all clips
-            video = mpy.concatenate_videoclips(clips_with_transitions, method="compose")
-            
-            # Add fade in to the first clip
-            video = video.fx(fadein, transition_duration)
-        else:
-            # Only one clip, add fade in and out
-            video = image_clips[0]
-            video = video.fx(fadein, 0.5)
-            video = video.fx(fadeout, 0.5)
-        
-        # Add audio if provided
-        if audio:
-            audio_clip = mpy.AudioFileClip(audio)
-            
-            # If audio is longer than video, trim audio
-            # If audio is shorter than video, loop audio
-            if audio_clip.duration > video.duration:
-                audio_clip = audio_clip.subclip(0, video.duration)
-            elif audio_clip.duration < video.duration:
-                # Calculate how many times to loop the audio
-                loop_count = int(video.duration / audio_clip.duration) + 1
-                audio_clip = mpy.concatenate_audioclips([audio_clip] * loop_count)
-                audio_clip = audio_clip.subclip(0, video.duration)
-            
-            # Set the audio to the video
-            video = video.set_audio(audio_clip)
-        
-        # Set FPS and ensure target resolution
-        video = video.set_fps(fps)
-        video = video.resize(width=target_width, height=target_height)
-        
         # Create temporary file to save the video
         with tempfile.NamedTemporaryFile(suffix=".mp4", delete=False) as tmp:
             output_path = tmp.name
         
-        # Write the video file
-        video.write_videofile(
-            output_path,
-            codec="libx264",
-            audio_codec="aac",
-            threads=4,
-            preset="medium"
+        command = _build_ffmpeg_command(
+            images, audio, fps, duration_per_image, transition_duration,
+            animation_type, target_width, target_height
         )
         
-        # Close all clips to release resources
-        video.close()
-        for clip in image_clips:
-            clip.close()
-        if audio:
-            audio_clip.close()
+        try:
+            # Write the video file, on a hardware encoder when one works
+            hw_codec = _detect_hw_codec()
+            try:
+                _run_ffmpeg(command + ["-c:v", hw_codec or "libx264"]
+                            + _HW_CODEC_PARAMS.get(hw_codec, _SOFTWARE_CODEC_PARAMS) + [output_path])
+            except RuntimeError:
+                if not hw_codec:
+                    raise
+                # The encoder passed the probe but failed on the real input
+                _run_ffmpeg(command + ["-c:v", "libx264"] + _SOFTWARE_CODEC_PARAMS + [output_path])
+        except Exception:
+            # Do not leave a half-written file behind
+            os.remove(output_path)
+            raise
         
         return output_path
         
     except Exception as e:
         raise RuntimeError(f"视频制作失败: {str(e)}") from e
+
+
+def _build_ffmpeg_command(images: List[str],
+                          audio: Optional[str],
+                          fps: int,
+                          duration_per_image: float,
+                          transition_duration: float,
+                          animation_type: str,
+                          target_width: int,
+                          target_height: int) -> List[str]:
+    """
+    Build the ffmpeg command up to (not including) the video encoder options.
+    
+    Args:
+        images: List of image file paths
+        audio: Optional audio file path
+        fps: Frames per second
+        duration_per_image: Duration to display each image (in seconds)
+        transition_duration: Duration of transitions between images (in seconds)
+        animation_type: Type of animation/transition to use
+        target_width: Target video width
+        target_height: Target video height
+        
+    Returns:
+        The command as an argument list
+    """
+    command = [_ffmpeg_binary(), "-hide_banner", "-loglevel", "error", "-y"]
+    for img_path in images:
+        # Each image is read as a single frame; it is repeated after scaling
+        command += ["-i", img_path]
+    
+    filters = []
+    for i in range(len(images)):
+        chain = _image_filter(i, fps, duration_per_image, animation_type, target_width, target_height)
+        if len(images) > 1 and i < len(images) - 1:
+            # Fade out every clip except the last one into the next
+            chain += f",fade=t=out:st={max(0.0, duration_per_image - transition_duration)}:d={transition_duration}"
+        filters.append(f"{chain}[v{i}]")
+    
+    if len(images) > 1:
+        # Concatenate all clips and fade in the start of the video
+        inputs = "".join(f"[v{i}]" for i in range(len(images)))
+        filters.append(
+            f"{inputs}concat=n={len(images)}:v=1:a=0,"
+            f"fade=t=in:st=0:d={transition_duration},format=yuv420p[vout]"
+        )
+    else:
+        # Only one clip, fade in and out
+        filters.append(f"[v0]{_fade_in_out(duration_per_image)},format=yuv420p[vout]")
+    
+    # Put the index first so players can start before the download finishes
+    output_options = ["-map", "[vout]", "-movflags", "+faststart"]
+    if audio:
+        # The demuxer loops audio shorter than the video, -t trims audio longer than it
+        total_duration = duration_per_image * len(images)
+        command += ["-stream_loop", "-1", "-i", audio]
+        output_options += ["-map", f"{len(images)}:a", "-c:a", "aac", "-t", str(total_duration)]
+    
+    # The per-image chains are independent branches of the graph, so the
+    # filter threads scale/crop/animate them in parallel
+    return command + [
+        "-filter_complex_threads", str(os.cpu_count() or 1),
+        "-filter_complex", ";".join(filters), "-r", str(fps)
+    ] + output_options
+
+
+def _image_filter(index: int,
+                  fps: int,
+                  duration: float,
+                  animation_type: str,
+                  target_width: int,
+                  target_height: int) -> str:
+    """
+    Build the filter chain that turns input ``index`` into an animated clip.
+    
+    Images are decoded, scaled to cover the target frame and center-cropped
+    once; the fitted frame is then repeated for the clip duration, so the
+    per-frame work is only the animation itself.
+    
+    Args:
+        index: Input index of the image
+        fps: Frames per second
+        duration: Duration to display the image (in seconds)
+        animation_type: Type of animation/transition to use
+        target_width: Target video width
+        target_height: Target video height
+        
+    Returns:
+        The filter chain (without an output label)
+    """
+    size = f"{target_width}x{target_height}"
+    frames = max(1, round(fps * duration))
+    if animation_type == "pan":
+        # The pan crops from the image enlarged 1.2x, so fit it to that size
+        # directly rather than resizing every repeated frame again
+        fit_width, fit_height = _even(target_width * _PAN_SCALE), _even(target_height * _PAN_SCALE)
+    else:
+        fit_width, fit_height = target_width, target_height
+    chain = (
+        f"[{index}:v]scale={fit_width}:{fit_height}:force_original_aspect_ratio=increase,"
+        f"crop={fit_width}:{fit_height},setsar=1,"
+        f"loop=loop={frames - 1}:size=1:start=0,setpts=N/{fps}/TB"
+    )
+    
+    # Add animations based on selected type
+    if animation_type == "fade":
+        # Fade in and out
+        chain += f",{_fade_in_out(duration)}"
+    elif animation_type == "zoom":
+        # Zoom in effect, 5% per second
+        chain += (
+            f",zoompan=z='1+0.05*in/{fps}':x='iw/2-iw/zoom/2':y='ih/2-ih/zoom/2'"
+            f":d=1:s={size}:fps={fps}"
+        )
+    elif animation_type == "pan":
+        # Pan effect: the image, enlarged 1.2x, slides right at 100 px/s.
+        # A moving crop window needs no background canvas to composite onto.
+        chain += f",crop={target_width}:{target_height}:x='max(0,iw-ow-100*t)':y='(ih-oh)/2'"
+    return chain
+
+
+def _even(value: float) -> int:
+    """Round a frame dimension to an even number, as yuv420p requires."""
+    return int(round(value / 2)) * 2
+
+
+def _fade_in_out(duration: float) -> str:
+    """Fade filters for the start and end of a clip of the given duration."""
+    fade_out_start = max(0.0, duration - _CLIP_FADE_DURATION)
+    return (
+        f"fade=t=in:st=0:d={_CLIP_FADE_DURATION},"
+        f"fade=t=out:st={fade_out_start}:d={_CLIP_FADE_DURATION}"
+    )
+
+
+def _run_ffmpeg(command: List[str]) -> None:
+    """
+    Run an ffmpeg command.
+    
+    Raises:
+        RuntimeError: If ffmpeg exits with an error
+    """
+    result = subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    if result.returncode != 0:
+        message = result.stderr.decode("utf-8", errors="replace").strip()
+        raise RuntimeError(f"ffmpeg执行失败: {message[-500:]}")
+
+
+@functools.lru_cache(maxsize=1)
+def _ffmpeg_binary() -> str:
+    """
+    Locate the ffmpeg executable.
+    
+    Uses FFMPEG_BINARY if set, then the binary bundled with imageio-ffmpeg,
+    then ffmpeg on PATH.
+    """
+    binary = os.getenv("FFMPEG_BINARY")
+    if binary:
+        return binary
+    try:
+        import imageio_ffmpeg
+        return imageio_ffmpeg.get_ffmpeg_exe()
+    except (ImportError, RuntimeError):
+        pass
+    return shutil.which("ffmpeg") or "ffmpeg"
+
+
+@functools.lru_cache(maxsize=None)
+def _detect_hw_codec() -> Optional[str]:
+    """
+    Find a hardware H.264 encoder that works on this machine.
+    
+    ffmpeg lists encoders it was built with even when no matching device is
+    present, so each candidate is checked with a short trial encode. The
+    result is cached for the lifetime of the process.
+    
+    Returns:
+        The encoder name, or None to use libx264
+    """
+    ffmpeg = _ffmpeg_binary()
+    try:
+        encoders = subprocess.run(
+            [ffmpeg, "-hide_banner", "-encoders"],
+            capture_output=True, text=True, timeout=10
+        ).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+    
+    for codec in _HW_CODEC_PARAMS:
+        if codec not in encoders:
+            continue
+        try:
+            trial = subprocess.run(
+                [ffmpeg, "-hide_banner", "-loglevel", "error",
+                 "-f", "lavfi", "-i", "color=c=black:s=256x256:d=0.1",
+                 "-c:v", codec, "-f", "null", "-"],
+                capture_output=True, timeout=10
+            )
+        except (OSError, subprocess.SubprocessError):
+            continue
+        if trial.returncode == 0:
+            return codec
+    return None
\ No newline at end of file
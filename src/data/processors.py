@@ -4,23 +4,157 @@ Contains functions for processing and formatting travel data.
 """
 
 import json
+import re
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 import os
+try:
+    import orjson
+except ImportError:  # Optional speedup, the standard library encoder is used otherwise
+    orjson = None
 
 try:
     from ..utils.helpers import sanitize_filename
 except ImportError:
     import sys
     import os
-    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    _SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if _SRC_DIR not in sys.path:
+        sys.path.insert(0, _SRC_DIR)
     from utils.helpers import sanitize_filename
 
 
+# HTML fragments of the formatters; dynamic values are filled in with str.format
+_HISTORY_HEADER = """
+    <div style="font-family: 'Segoe UI', 'Microsoft YaHei', sans-serif;">
+        <h3>旅行历史记录</h3>
+        <div style="display: grid; gap: 15px;">
+    """
+_HISTORY_RECORD_TEMPLATE = """
+        <div style="background: #f8f9fa; padding: 15px; border-radius: 8px; border-left: 4px solid #007bff;">
+            <div style="display: flex; justify-content: between; align-items: center;">
+                <h4 style="margin: 0 0 10px 0; color: #333;">{destination}</h4>
+                <span style="color: #666; font-size: 14px;">{date}</span>
+            </div>
+            <p style="margin: 5px 0; color: #555;">出发地: {origin}</p>
+            <p style="margin: 5px 0; color: #555;">时长: {duration}</p>
+            <p style="margin: 5px 0; color: #555;">备注: {notes}</p>
+        </div>
+        """
+_HISTORY_FOOTER = """
+        </div>
+    </div>
+    """
+
+_WEATHER_TEMPLATE = """
+        <div style="font-family: 'Segoe UI', 'Microsoft YaHei', sans-serif; background: linear-gradient(135deg, #74b9ff, #0984e3); color: white; padding: 20px; border-radius: 15px;">
+            <h3 style="margin: 0 0 15px 0; text-align: center;">🌤️ {location} 天气信息</h3>
+            
+            <div style="background: rgba(255,255,255,0.2); padding: 15px; border-radius: 10px; margin-bottom: 15px;">
+                <h4 style="margin: 0 0 10px 0;">当前天气</h4>
+                <p style="margin: 5px 0;">温度: {temperature}°C</p>
+                <p style="margin: 5px 0;">天气: {condition}</p>
+                <p style="margin: 5px 0;">湿度: {humidity}%</p>
+                <p style="margin: 5px 0;">风速: {wind_speed} km/h</p>
+            </div>
+        """
+_FORECAST_HEADER = """
+            <div style="background: rgba(255,255,255,0.2); padding: 15px; border-radius: 10px;">
+                <h4 style="margin: 0 0 10px 0;">未来预报</h4>
+                <div style="display: grid; grid-template-columns: repeat(auto-fit, minmax(120px, 1fr)); gap: 10px;">
+            """
+_FORECAST_DAY_TEMPLATE = """
+                <div style="background: rgba(255,255,255,0.1); padding: 10px; border-radius: 8px; text-align: center;">
+                    <p style="margin: 0; font-weight: bold;">{date}</p>
+                    <p style="margin: 5px 0;">{condition}</p>
+                    <p style="margin: 0; font-size: 14px;">{high}° / {low}°</p>
+                </div>
+                """
+_FORECAST_FOOTER = """
+                </div>
+            </div>
+        """
+
+_DESTINATION_TEMPLATE = """
+        <div style="font-family: 'Segoe UI', 'Microsoft YaHei', sans-serif; background: #f8f9fa; padding: 20px; border-radius: 15px; border: 1px solid #e9ecef;">
+            <h2 style="color: #2c3e50; margin: 0 0 20px 0; text-align: center;">🏞️ {name}</h2>
+            
+            <div style="background: white; padding: 15px; border-radius: 10px; margin-bottom: 15px;">
+                <h4 style="color: #34495e; margin: 0 0 10px 0;">📍 目的地介绍</h4>
+                <p style="color: #555; line-height: 1.6; margin: 0;">{description}</p>
+            </div>
+            
+            <div style="background: white; padding: 15px; border-radius: 10px; margin-bottom: 15px;">
+                <h4 style="color: #34495e; margin: 0 0 10px 0;">🌸 最佳旅游时间</h4>
+                <p style="color: #555; margin: 0;">{best_time}</p>
+            </div>
+        """
+_TRANSPORTATION_TEMPLATE = """
+            <div style="background: white; padding: 15px; border-radius: 10px; margin-bottom: 15px;">
+                <h4 style="color: #34495e; margin: 0 0 10px 0;">🚗 交通信息</h4>
+                <p style="color: #555; margin: 0;">{transportation}</p>
+            </div>
+            """
+_ATTRACTIONS_HEADER = """
+            <div style="background: white; padding: 15px; border-radius: 10px; margin-bottom: 15px;">
+                <h4 style="color: #34495e; margin: 0 0 10px 0;">🎯 主要景点</h4>
+                <ul style="margin: 0; padding-left: 20px; color: #555;">
+            """
+_ACCOMMODATION_HEADER = """
+            <div style="background: white; padding: 15px; border-radius: 10px;">
+                <h4 style="color: #34495e; margin: 0 0 10px 0;">🏨 住宿推荐</h4>
+                <ul style="margin: 0; padding-left: 20px; color: #555;">
+            """
+_LIST_FOOTER = """
+                </ul>
+            </div>
+            """
+
+_SUMMARY_TEMPLATE = """
+        <div style="font-family: 'Segoe UI', 'Microsoft YaHei', sans-serif; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 25px; border-radius: 15px; margin-bottom: 20px;">
+            <h3 style="margin: 0 0 15px 0; text-align: center; font-size: 24px;">📋 旅行计划摘要</h3>
+            
+            <div style="background: rgba(255,255,255,0.1); padding: 15px; border-radius: 10px; margin-bottom: 15px;">
+                <p style="margin: 5px 0; font-size: 16px;"><strong>目的地:</strong> {destination}</p>
+                <p style="margin: 5px 0; font-size: 16px;"><strong>时长:</strong> {duration}</p>
+                <p style="margin: 5px 0; font-size: 16px;"><strong>预估费用:</strong> {total_cost}</p>
+            </div>
+            
+            <div style="background: rgba(255,255,255,0.1); padding: 15px; border-radius: 10px;">
+                <h4 style="margin: 0 0 10px 0;">🌟 行程亮点</h4>
+                <ul style="margin: 0; padding-left: 20px;">
+        """
+_SUMMARY_FOOTER = """
+                </ul>
+            </div>
+        </div>
+        """
+
+_CARD_END = """
+        </div>
+        """
+_LIST_ITEM_TEMPLATE = '<li style="margin-bottom: 5px;">{}</li>'
+
+# Spaces and slashes in place names become underscores in filenames
+_FILENAME_SEPARATOR_TABLE = str.maketrans({" ": "_", "/": "_"})
+
+# Characters str.isalnum() rejects, other than "._-" (\w is isalnum() plus "_")
+_UNSAFE_FILENAME_CHARS_RE = re.compile(r"[^\w.-]")
+
+# Escapes markup characters in one pass over the string
+_HTML_ESCAPE_TABLE = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;"})
+
+
+def _escape(value: Any) -> str:
+    """Escape a value for insertion into the HTML templates."""
+    return str(value).translate(_HTML_ESCAPE_TABLE)
+
+
 def save_checklist_data(data: Dict[str, Any], 
                        origin: str, 
                        destination: str, 
-                       duration: str) -> Optional[str]:
+                       duration: str,
+                       data_dir: str = "checklist_data") -> Optional[str]:
     """
     Save checklist data to a JSON file.
     
@@ -29,30 +163,31 @@ def save_checklist_data(data: Dict[str, Any],
         origin: Departure location
         destination: Travel destination
         duration: Trip duration
+        data_dir: Directory to save the file in
         
     Returns:
         Path to saved file or None if save failed
     """
     try:
         # Create data directory if it doesn't exist
-        data_dir = "checklist_data"
         os.makedirs(data_dir, exist_ok=True)
         
         # Generate filename
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        safe_origin = origin.replace(" ", "_").replace("/", "_")[:20]
-        safe_destination = destination.replace(" ", "_").replace("/", "_")[:20]
+        now = datetime.now()
+        timestamp = now.strftime("%Y%m%d_%H%M%S")
+        safe_origin = origin.translate(_FILENAME_SEPARATOR_TABLE)[:20]
+        safe_destination = destination.translate(_FILENAME_SEPARATOR_TABLE)[:20]
         filename = f"checklist_{safe_origin}_to_{safe_destination}_{duration}_{timestamp}.json"
         
         # Ensure filename is safe
-        filename = "".join(c for c in filename if c.isalnum() or c in "._-")
+        filename = _UNSAFE_FILENAME_CHARS_RE.sub("", filename)
         
         filepath = os.path.join(data_dir, filename)
         
         # Add metadata
         data_with_metadata = {
             "metadata": {
-                "created_at": datetime.now().isoformat(),
+                "created_at": now.isoformat(),
                 "origin": origin,
                 "destination": destination,
                 "duration": duration,
@@ -62,8 +197,12 @@ def save_checklist_data(data: Dict[str, Any],
         }
         
         # Save to file
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(data_with_metadata, f, ensure_ascii=False, indent=2)
+        if orjson is not None:
+            with open(filepath, 'wb') as f:
+                f.write(orjson.dumps(data_with_metadata, option=orjson.OPT_INDENT_2))
+        else:
+            with open(filepath, 'w', encoding='utf-8') as f:
+                json.dump(data_with_metadata, f, ensure_ascii=False, indent=2)
         
         return filepath
         
@@ -83,8 +222,12 @@ def load_checklist_data(filepath: str) -> Optional[Dict[str, Any]]:
         Loaded checklist data or None if load failed
     """
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        if orjson is not None:
+            with open(filepath, 'rb') as f:
+                data = orjson.loads(f.read())
+        else:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                data = json.load(f)
             
         # Return the checklist data, not the metadata
         return data.get("checklist", data)
@@ -107,31 +250,18 @@ def format_travel_history(travel_data: List[Dict[str, Any]]) -> str:
     if not travel_data:
         return "<p>暂无旅行记录</p>"
     
-    html = """
-    <div style="font-family: 'Segoe UI', 'Microsoft YaHei', sans-serif;">
-        <h3>旅行历史记录</h3>
-        <div style="display: grid; gap: 15px;">
-    """
-    
+    parts = [_HISTORY_HEADER]
     for record in travel_data:
-        html += f"""
-        <div style="background: #f8f9fa; padding: 15px; border-radius: 8px; border-left: 4px solid #007bff;">
-            <div style="display: flex; justify-content: between; align-items: center;">
-                <h4 style="margin: 0 0 10px 0; color: #333;">{record.get('destination', '未知目的地')}</h4>
-                <span style="color: #666; font-size: 14px;">{record.get('date', '未知日期')}</span>
-            </div>
-            <p style="margin: 5px 0; color: #555;">出发地: {record.get('origin', '未知')}</p>
-            <p style="margin: 5px 0; color: #555;">时长: {record.get('duration', '未知')}</p>
-            <p style="margin: 5px 0; color: #555;">备注: {record.get('notes', '无')}</p>
-        </div>
-        """
-    
-    html += """
-        </div>
-    </div>
-    """
+        parts.append(_HISTORY_RECORD_TEMPLATE.format(
+            destination=_escape(record.get('destination', '未知目的地')),
+            date=_escape(record.get('date', '未知日期')),
+            origin=_escape(record.get('origin', '未知')),
+            duration=_escape(record.get('duration', '未知')),
+            notes=_escape(record.get('notes', '无'))
+        ))
+    parts.append(_HISTORY_FOOTER)
     
-    return html
+    return "".join(parts)
 
 
 def process_weather_data(weather_data: Dict[str, Any]) -> str:
@@ -145,49 +275,31 @@ def process_weather_data(weather_data: Dict[str, Any]) -> str:
         Formatted weather information HTML
     """
     try:
-        location = weather_data.get("location", "未知地区")
         current = weather_data.get("current", {})
         forecast = weather_data.get("forecast", [])
         
-        html = f"""
-        <div style="font-family: 'Segoe UI', 'Microsoft YaHei', sans-serif; background: linear-gradient(135deg, #74b9ff, #0984e3); color: white; padding: 20px; border-radius: 15px;">
-            <h3 style="margin: 0 0 15px 0; text-align: center;">🌤️ {location} 天气信息</h3>
-            
-            <div style="background: rgba(255,255,255,0.2); padding: 15px; border-radius: 10px; margin-bottom: 15px;">
-                <h4 style="margin: 0 0 10px 0;">当前天气</h4>
-                <p style="margin: 5px 0;">温度: {current.get('temperature', '未知')}°C</p>
-                <p style="margin: 5px 0;">天气: {current.get('condition', '未知')}</p>
-                <p style="margin: 5px 0;">湿度: {current.get('humidity', '未知')}%</p>
-                <p style="margin: 5px 0;">风速: {current.get('wind_speed', '未知')} km/h</p>
-            </div>
-        """
+        parts = [_WEATHER_TEMPLATE.format(
+            location=_escape(weather_data.get("location", "未知地区")),
+            temperature=_escape(current.get('temperature', '未知')),
+            condition=_escape(current.get('condition', '未知')),
+            humidity=_escape(current.get('humidity', '未知')),
+            wind_speed=_escape(current.get('wind_speed', '未知'))
+        )]
         
         if forecast:
-            html += """
-            <div style="background: rgba(255,255,255,0.2); padding: 15px; border-radius: 10px;">
-                <h4 style="margin: 0 0 10px 0;">未来预报</h4>
-                <div style="display: grid; grid-template-columns: repeat(auto-fit, minmax(120px, 1fr)); gap: 10px;">
-            """
-            
+            parts.append(_FORECAST_HEADER)
             for day in forecast[:5]:  # Show only 5 days
-                html += f"""
-                <div style="background: rgba(255,255,255,0.1); padding: 10px; border-radius: 8px; text-align: center;">
-                    <p style="margin: 0; font-weight: bold;">{day.get('date', '')}</p>
-                    <p style="margin: 5px 0;">{day.get('condition', '未知')}</p>
-                    <p style="margin: 0; font-size: 14px;">{day.get('high', '未知')}° / {day.get('low', '未知')}°</p>
-                </div>
-                """
-            
-            html += """
-                </div>
-            </div>
-        """
+                parts.append(_FORECAST_DAY_TEMPLATE.format(
+                    date=_escape(day.get('date', '')),
+                    condition=_escape(day.get('condition', '未知')),
+                    high=_escape(day.get('high', '未知')),
+                    low=_escape(day.get('low', '未知'))
+                ))
+            parts.append(_FORECAST_FOOTER)
         
-        html += """
-        </div>
-        """
+        parts.append(_CARD_END)
         
-        return html
+        return "".join(parts)
         
     except Exception as e:
         return f"<p style='color: red;'>天气数据处理失败: {str(e)}</p>"
@@ -204,71 +316,32 @@ def format_destination_info(destination_data: Dict[str, Any]) -> str:
         Formatted HTML string
     """
     try:
-        name = destination_data.get("name", "未知目的地")
-        description = destination_data.get("description", "暂无描述")
         attractions = destination_data.get("attractions", [])
-        best_time = destination_data.get("best_time", "全年")
         transportation = destination_data.get("transportation", "")
         accommodation = destination_data.get("accommodation", [])
         
-        html = f"""
-        <div style="font-family: 'Segoe UI', 'Microsoft YaHei', sans-serif; background: #f8f9fa; padding: 20px; border-radius: 15px; border: 1px solid #e9ecef;">
-            <h2 style="color: #2c3e50; margin: 0 0 20px 0; text-align: center;">🏞️ {name}</h2>
-            
-            <div style="background: white; padding: 15px; border-radius: 10px; margin-bottom: 15px;">
-                <h4 style="color: #34495e; margin: 0 0 10px 0;">📍 目的地介绍</h4>
-                <p style="color: #555; line-height: 1.6; margin: 0;">{description}</p>
-            </div>
-            
-            <div style="background: white; padding: 15px; border-radius: 10px; margin-bottom: 15px;">
-                <h4 style="color: #34495e; margin: 0 0 10px 0;">🌸 最佳旅游时间</h4>
-                <p style="color: #555; margin: 0;">{best_time}</p>
-            </div>
-        """
+        parts = [_DESTINATION_TEMPLATE.format(
+            name=_escape(destination_data.get("name", "未知目的地")),
+            description=_escape(destination_data.get("description", "暂无描述")),
+            best_time=_escape(destination_data.get("best_time", "全年"))
+        )]
         
         if transportation:
-            html += f"""
-            <div style="background: white; padding: 15px; border-radius: 10px; margin-bottom: 15px;">
-                <h4 style="color: #34495e; margin: 0 0 10px 0;">🚗 交通信息</h4>
-                <p style="color: #555; margin: 0;">{transportation}</p>
-            </div>
-            """
+            parts.append(_TRANSPORTATION_TEMPLATE.format(transportation=_escape(transportation)))
         
         if attractions:
-            html += """
-            <div style="background: white; padding: 15px; border-radius: 10px; margin-bottom: 15px;">
-                <h4 style="color: #34495e; margin: 0 0 10px 0;">🎯 主要景点</h4>
-                <ul style="margin: 0; padding-left: 20px; color: #555;">
-            """
-            
-            for attraction in attractions:
-                html += f'<li style="margin-bottom: 5px;">{attraction}</li>'
-            
-            html += """
-                </ul>
-            </div>
-            """
+            parts.append(_ATTRACTIONS_HEADER)
+            parts.extend(_LIST_ITEM_TEMPLATE.format(_escape(attraction)) for attraction in attractions)
+            parts.append(_LIST_FOOTER)
         
         if accommodation:
-            html += """
-            <div style="background: white; padding: 15px; border-radius: 10px;">
-                <h4 style="color: #34495e; margin: 0 0 10px 0;">🏨 住宿推荐</h4>
-                <ul style="margin: 0; padding-left: 20px; color: #555;">
-            """
-            
-            for hotel in accommodation:
-                html += f'<li style="margin-bottom: 5px;">{hotel}</li>'
-            
-            html += """
-                </ul>
-            </div>
-            """
+            parts.append(_ACCOMMODATION_HEADER)
+            parts.extend(_LIST_ITEM_TEMPLATE.format(_escape(hotel)) for hotel in accommodation)
+            parts.append(_LIST_FOOTER)
         
-        html += """
-        </div>
-        """
+        parts.append(_CARD_END)
         
-        return html
+        return "".join(parts)
         
     except Exception as e:
         return f"<p style='color: red;'>目的地信息格式化失败: {str(e)}</p>"
@@ -285,36 +358,15 @@ def create_travel_summary(travel_plan: Dict[str, Any]) -> str:
         Formatted summary HTML
     """
     try:
-        destination = travel_plan.get("destination", "未知")
-        duration = travel_plan.get("duration", "未知")
-        total_cost = travel_plan.get("estimated_cost", "未估算")
-        highlights = travel_plan.get("highlights", [])
-        
-        html = f"""
-        <div style="font-family: 'Segoe UI', 'Microsoft YaHei', sans-serif; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 25px; border-radius: 15px; margin-bottom: 20px;">
-            <h3 style="margin: 0 0 15px 0; text-align: center; font-size: 24px;">📋 旅行计划摘要</h3>
-            
-            <div style="background: rgba(255,255,255,0.1); padding: 15px; border-radius: 10px; margin-bottom: 15px;">
-                <p style="margin: 5px 0; font-size: 16px;"><strong>目的地:</strong> {destination}</p>
-                <p style="margin: 5px 0; font-size: 16px;"><strong>时长:</strong> {duration}</p>
-                <p style="margin: 5px 0; font-size: 16px;"><strong>预估费用:</strong> {total_cost}</p>
-            </div>
-            
-            <div style="background: rgba(255,255,255,0.1); padding: 15px; border-radius: 10px;">
-                <h4 style="margin: 0 0 10px 0;">🌟 行程亮点</h4>
-                <ul style="margin: 0; padding-left: 20px;">
-        """
-        
-        for highlight in highlights:
-            html += f'<li style="margin-bottom: 5px;">{highlight}</li>'
-        
-        html += """
-                </ul>
-            </div>
-        </div>
-        """
+        parts = [_SUMMARY_TEMPLATE.format(
+            destination=_escape(travel_plan.get("destination", "未知")),
+            duration=_escape(travel_plan.get("duration", "未知")),
+            total_cost=_escape(travel_plan.get("estimated_cost", "未估算"))
+        )]
+        parts.extend(_LIST_ITEM_TEMPLATE.format(_escape(highlight)) for highlight in travel_plan.get("highlights", []))
+        parts.append(_SUMMARY_FOOTER)
         
-        return html
+        return "".join(parts)
         
     except Exception as e:
         return f"<p style='color: red;'>旅行摘要生成失败: {str(e)}</p>"
\ No newline at end of file
@@ -14,7 +14,7 @@ try:
     from .config.config import APP_TITLE, APP_DESCRIPTION, CUSTOM_CSS
     from .core.travel_functions import (
         generate_destination_recommendation,
-        generate_itinerary_plan,
+        stream_itinerary_plan,
         generate_checklist
     )
     from .core.video_editor import create_video_from_images, validate_media_files
@@ -34,7 +34,7 @@ except ImportError:
     from config.config import APP_TITLE, APP_DESCRIPTION, CUSTOM_CSS
     from core.travel_functions import (
         generate_destination_recommendation,
-        generate_itinerary_plan,
+        stream_itinerary_plan,
         generate_checklist
     )
     from core.video_editor import create_video_from_images, validate_media_files
@@ -97,9 +97,9 @@ def create_app() -> gr.Blocks:
             
             # Bind itinerary planning events - store result in state
             def generate_itinerary_with_state(destination, duration, mobility, health_focus):
-                """Generate itinerary and store it in state for checklist sharing."""
-                result = generate_itinerary_plan(destination, duration, mobility, health_focus)
-                return result, result, destination, duration  # Return itinerary, state updates, and shared values
+                """Stream the itinerary and store it in state for checklist sharing."""
+                for result in stream_itinerary_plan(destination, duration, mobility, health_focus):
+                    yield result, result, destination, duration  # Return itinerary, state updates, and shared values
             
             itinerary_section['button'].click(
                 fn=generate_itinerary_with_state,
@@ -1,16 +1,6 @@
 """UI components module for the travel assistant application."""
 
-from .components import (
-    create_header,
-    create_destination_section,
-    create_itinerary_section,
-    create_checklist_section,
-    create_video_editor_section,
-    create_footer,
-    create_loading_animation,
-    hide_loading_animation,
-    create_app_theme
-)
+import importlib
 
 __all__ = [
     'create_header',
@@ -22,4 +12,22 @@ __all__ = [
     'create_loading_animation',
     'hide_loading_animation',
     'create_app_theme'
-]
\ No newline at end of file
+]
+
+# The components pull in gradio, so they are imported on first attribute
+# access (PEP 562) rather than when the package is imported
+_COMPONENT_NAMES = frozenset(__all__)
+
+
+def __getattr__(name):
+    """Import the components module on first access to one of its names."""
+    if name not in _COMPONENT_NAMES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    components = importlib.import_module(".components", __name__)
+    for attr in _COMPONENT_NAMES:
+        globals()[attr] = getattr(components, attr)
+    return globals()[name]
+
+
+def __dir__():
+    return sorted(set(globals()) | _COMPONENT_NAMES)
\ No newline at end of file
@@ -17,7 +17,9 @@ try:
 except ImportError:
     import sys
     import os
-    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    _SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if _SRC_DIR not in sys.path:
+        sys.path.insert(0, _SRC_DIR)
     from config.config import (
         INTEREST_OPTIONS, HEALTH_FOCUS_OPTIONS, SEASON_OPTIONS, 
         HEALTH_STATUS_OPTIONS, BUDGET_OPTIONS, MOBILITY_OPTIONS, 
@@ -3,17 +3,82 @@ Utility functions module for the travel assistant application.
 Contains helper functions for validation, cleaning, and general utilities.
 """
 
+import functools
 import json
 import re
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Union
+try:
+    import orjson
+except ImportError:  # Optional speedup, the standard library parser is used otherwise
+    orjson = None
+try:
+    import re2
+except ImportError:  # Optional linear-time engine for the hotel keyword scan
+    re2 = None
 try:
     from ..config.config import MAX_INPUT_LENGTH, ALLOWED_SEASONS, ALLOWED_HEALTH_STATUS, ALLOWED_BUDGET, ALLOWED_MOBILITY, ALLOWED_DURATION
 except ImportError:
     import sys
     import os
-    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    _SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if _SRC_DIR not in sys.path:
+        sys.path.insert(0, _SRC_DIR)
     from config.config import MAX_INPUT_LENGTH, ALLOWED_SEASONS, ALLOWED_HEALTH_STATUS, ALLOWED_BUDGET, ALLOWED_MOBILITY, ALLOWED_DURATION
 
+# Opening ```json and closing ``` fences; a closing fence is not taken from
+# the front of an opening one
+_JSON_FENCE_RE = re.compile(r'```json\n?|\n?```(?!json)')
+_BLANK_LINES_RE = re.compile(r'\n{3,}')
+_HARMFUL_INPUT_RE = re.compile(r'<script|javascript:|onerror=|onload=', re.IGNORECASE)
+
+# Deletes characters invalid in filenames and turns spaces into underscores
+_FILENAME_TABLE = str.maketrans(' ', '_', '<>:"/\\|?*')
+
+# Deletes CJK unified ideographs (U+4E00..U+9FFF); text containing any gets shorter
+_CHINESE_CHAR_DELETE_TABLE = dict.fromkeys(range(0x4e00, 0xa000))
+
+# (input key, allowed values, error message) of each dropdown selection
+_CHOICE_FIELDS = (
+    ('season', frozenset(ALLOWED_SEASONS), "请选择有效的季节选项"),
+    ('health_status', frozenset(ALLOWED_HEALTH_STATUS), "请选择有效的健康状况"),
+    ('budget', frozenset(ALLOWED_BUDGET), "请选择有效的预算范围"),
+    ('mobility', frozenset(ALLOWED_MOBILITY), "请选择有效的行动能力选项"),
+    ('duration', frozenset(ALLOWED_DURATION), "请选择有效的旅行时长"),
+)
+
+# Obviously invalid location patterns, combined so one scan checks them all
+_INVALID_LOCATION_RE = re.compile(
+    r'<[^>]+>'  # HTML tags
+    r'|javascript:'  # JavaScript
+    r'|on\w+='  # Event handlers
+    r'|[<>"\'&]',  # Special characters
+    re.IGNORECASE
+)
+
+# Hotel extraction patterns. A labelled name is tried first on each line, so
+# text before the label cannot pull the label into the name; the other
+# patterns are fused into one alternation where the first match at each
+# position wins. Repetitions are bounded so a long keyword-free line cannot
+# make every start position rescan it to the end.
+_HOTEL_LABEL_RE = re.compile(
+    r'(?:入住|住宿(?:推荐)?|下榻|推荐(?:酒店|住宿)|酒店|宾馆|度假村|客栈)[：:]\s*'
+    r'([^\n，,。.]{1,60})',  # 入住: 名称 / 酒店: 名称 / 推荐酒店: 名称
+    re.IGNORECASE
+)
+_HOTEL_RE = re.compile(
+    r'[-•]\s*(?P<listed>[^\n，,。.]{0,40}?(?:酒店|宾馆|度假村|客栈|Hotel|Resort|Inn|Motel)[^\n，,。.]{0,20})'  # - 名称
+    r'|(?P<named>[^\s，,。.\-•][^\n，,。.]{0,40}?(?:酒店|宾馆|度假村|客栈|Hotel|Resort|Inn|Motel)[^\n，,。.]{0,20})',  # 包含酒店关键词, 位置/预订描述
+    re.IGNORECASE
+)
+_MAX_HOTELS = 10
+# Most texts mention no hotel at all; one scan for a hotel keyword or a
+# lodging label (a DFA when re2 is installed) rejects them before the
+# extraction regexes run. Labels count on their own: "入住：北京饭店" holds
+# no keyword.
+_HOTEL_HINT_RE = (re2 or re).compile(
+    r'(?i)酒店|宾馆|度假村|客栈|Hotel|Resort|Inn|Motel|(?:入住|住宿(?:推荐)?|下榻)[：:]'
+)
+
 
 def clean_response(response_text: str) -> str:
     """
@@ -26,14 +91,13 @@ def clean_response(response_text: str) -> str:
         Cleaned and formatted response text
     """
     # Remove markdown formatting
-    response_text = re.sub(r'```json\n?', '', response_text)
-    response_text = re.sub(r'\n?```', '', response_text)
+    response_text = _JSON_FENCE_RE.sub('', response_text)
     
     # Remove leading/trailing whitespace
     response_text = response_text.strip()
     
     # Remove extra blank lines
-    response_text = re.sub(r'\n{3,}', '\n\n', response_text)
+    response_text = _BLANK_LINES_RE.sub('\n\n', response_text)
     
     return response_text
 
@@ -57,46 +121,44 @@ def validate_inputs(inputs: Dict[str, Any]) -> Dict[str, str]:
             if len(inputs[field]) > MAX_INPUT_LENGTH:
                 errors[field] = f"输入内容过长，请控制在{MAX_INPUT_LENGTH}字符以内"
             
-            # Check for potentially harmful content
-            if re.search(r'<script|javascript:|onerror=|onload=', inputs[field], re.IGNORECASE):
+            # Check for potentially harmful content. Every match contains
+            # '<', ':' or '=', so plain text skips the regex.
+            value = inputs[field]
+            if ('<' in value or ':' in value or '=' in value) and _HARMFUL_INPUT_RE.search(value):
                 errors[field] = "输入内容包含不安全字符"
     
     # Validate dropdown selections
-    if 'season' in inputs and inputs['season'] not in ALLOWED_SEASONS:
-        errors['season'] = "请选择有效的季节选项"
-    
-    if 'health_status' in inputs and inputs['health_status'] not in ALLOWED_HEALTH_STATUS:
-        errors['health_status'] = "请选择有效的健康状况"
-    
-    if 'budget' in inputs and inputs['budget'] not in ALLOWED_BUDGET:
-        errors['budget'] = "请选择有效的预算范围"
-    
-    if 'mobility' in inputs and inputs['mobility'] not in ALLOWED_MOBILITY:
-        errors['mobility'] = "请选择有效的行动能力选项"
-    
-    if 'duration' in inputs and inputs['duration'] not in ALLOWED_DURATION:
-        errors['duration'] = "请选择有效的旅行时长"
+    for field, allowed, message in _CHOICE_FIELDS:
+        if field in inputs and inputs[field] not in allowed:
+            errors[field] = message
     
     return errors
 
 
-def safe_json_parse(json_string: str) -> Optional[Dict[str, Any]]:
+def safe_json_parse(json_string: Union[str, bytes]) -> Optional[Dict[str, Any]]:
     """
     Safely parse JSON string with error handling.
     
     Args:
-        json_string: JSON string to parse
+        json_string: JSON string to parse, or its UTF-8 bytes (parsed
+            without decoding first when orjson is installed)
         
     Returns:
         Parsed dictionary or None if parsing fails
     """
     try:
-        # Clean the JSON string first
-        json_string = clean_response(json_string)
+        # Clean the JSON string first. Without code fences cleaning only
+        # touches whitespace outside JSON strings, which the parser skips anyway.
+        if isinstance(json_string, (bytes, bytearray)):
+            if b'```' in json_string:
+                json_string = clean_response(json_string.decode('utf-8'))
+        elif '```' in json_string:
+            json_string = clean_response(json_string)
+        if orjson is not None:
+            return orjson.loads(json_string)
         return json.loads(json_string)
-    except json.JSONDecodeError:
-        return None
     except Exception:
+        # Either parser's JSONDecodeError (both are ValueErrors), bad UTF-8, non-text input
         return None
 
 
@@ -110,10 +172,7 @@ def format_interests(interests: List[str]) -> str:
     Returns:
         Formatted string of interests
     """
-    if not interests:
-        return "暂无特别偏好"
-    
-    return "、".join(interests)
+    return _format_options(tuple(interests) if interests else (), "暂无特别偏好")
 
 
 def format_health_focus(health_focus: List[str]) -> str:
@@ -126,10 +185,16 @@ def format_health_focus(health_focus: List[str]) -> str:
     Returns:
         Formatted string of health focuses
     """
-    if not health_focus:
-        return "暂无特别关注点"
+    return _format_options(tuple(health_focus) if health_focus else (), "暂无特别关注点")
+
+
+@functools.lru_cache(maxsize=256)
+def _format_options(options: tuple, empty_message: str) -> str:
+    """Join selected options, memoized as the same dropdown selections recur."""
+    if not options:
+        return empty_message
     
-    return "、".join(health_focus)
+    return "、".join(options)
 
 
 def sanitize_filename(filename: str) -> str:
@@ -142,11 +207,8 @@ def sanitize_filename(filename: str) -> str:
     Returns:
         Sanitized filename safe for filesystem use
     """
-    # Remove invalid characters
-    filename = re.sub(r'[<>:"/\\|?*]', '', filename)
-    
-    # Replace spaces with underscores
-    filename = filename.replace(' ', '_')
+    # Remove invalid characters and replace spaces with underscores
+    filename = filename.translate(_FILENAME_TABLE)
     
     # Limit length
     if len(filename) > 100:
@@ -169,7 +231,7 @@ def truncate_text(text: str, max_length: int = 1000) -> str:
     if len(text) <= max_length:
         return text
     
-    return text[:max_length - 3] + "..."
+    return f"{text[:max_length - 3]}..."
 
 
 def extract_json_from_text(text: str) -> Optional[str]:
@@ -182,23 +244,26 @@ def extract_json_from_text(text: str) -> Optional[str]:
     Returns:
         Extracted JSON string or None
     """
-    # Look for JSON-like content between curly braces
-    json_match = re.search(r'\{[\s\S]*\}', text)
-    if json_match:
-        return json_match.group(0)
-    
-    # Look for JSON-like content between square brackets
-    json_match = re.search(r'\[[\s\S]*\]', text)
-    if json_match:
-        return json_match.group(0)
+    # Look for JSON-like content from the first opening to the last closing
+    # curly brace, then square bracket
+    for opening, closing in ('{', '}'), ('[', ']'):
+        start = text.find(opening)
+        if start != -1:
+            end = text.rfind(closing)
+            if end > start:
+                return text[start:end + 1]
     
     return None
 
 
+@functools.lru_cache(maxsize=1024)
 def is_valid_chinese_location(location: str) -> bool:
     """
     Basic validation for Chinese location names.
     
+    Results are memoized, as the same few destinations are checked on
+    every request.
+    
     Args:
         location: Location name to validate
         
@@ -209,28 +274,20 @@ def is_valid_chinese_location(location: str) -> bool:
         return False
     
     # Check if it contains Chinese characters
-    if not re.search(r'[\u4e00-\u9fff]', location):
+    if len(location.translate(_CHINESE_CHAR_DELETE_TABLE)) == len(location):
         return False
     
-    # Check for obviously invalid patterns
-    invalid_patterns = [
-        r'<[^>]+>',  # HTML tags
-        r'javascript:',  # JavaScript
-        r'on\w+=',  # Event handlers
-        r'[<>"\'&]',  # Special characters
-    ]
-    
-    for pattern in invalid_patterns:
-        if re.search(pattern, location, re.IGNORECASE):
-            return False
-    
-    return True
+    # Check for obviously invalid patterns in a single pass
+    return not _INVALID_LOCATION_RE.search(location)
 
 
 def extract_hotels_from_itinerary(itinerary_text: str) -> List[str]:
     """
     Extract hotel information from itinerary content.
     
+    The same itinerary is passed in again for every checklist generated
+    from it, so results are memoized.
+    
     Args:
         itinerary_text: Itinerary content to extract hotels from
         
@@ -240,30 +297,36 @@ def extract_hotels_from_itinerary(itinerary_text: str) -> List[str]:
     if not itinerary_text:
         return []
     
-    hotels = []
-    
-    # Hotel extraction patterns - comprehensive matching
-    hotel_patterns = [
-        r'(?:入住|住宿|下榻)[：:]\s*([^\n，,。.]+)',  # 入住: 名称
-        r'(?:酒店|宾馆|度假村|客栈)[：:]\s*([^\n，,。.]+)',  # 酒店: 名称
-        r'推荐(?:酒店|住宿)[：:]\s*([^\n，,。.]+)',  # 推荐酒店: 名称
-        r'([^\n，,。.]*(?:酒店|宾馆|度假村|客栈)[^\n，,。.]*)',  # 包含酒店关键词
-        r'([^\n，,。.]*(?:Hotel|Resort|Inn|Motel)[^\n，,。.]*)',  # 英文酒店关键词
-        r'(?:位于|在)([^\n，,。.]*(?:酒店|宾馆|度假村|客栈)[^\n，,。.]*)',  # 位置描述
-        r'(?:预订|预约)([^\n，,。.]*(?:酒店|宾馆|度假村|客栈)[^\n，,。.]*)',  # 预订描述
-    ]
-    
-    for pattern in hotel_patterns:
-        matches = re.findall(pattern, itinerary_text, re.IGNORECASE)
-        hotels.extend(matches)
-    
-    # Additional extraction for specific formats
-    # Look for patterns like "- 酒店名称" or "• 酒店名称"
-    list_patterns = re.findall(r'[-•]\s*([^\n，,。.]*(?:酒店|宾馆|度假村|客栈)[^\n，,。.]*)', itinerary_text, re.IGNORECASE)
-    hotels.extend(list_patterns)
-    
-    # Clean and deduplicate
-    hotels = [hotel.strip() for hotel in hotels if hotel.strip()]
-    hotels = list(dict.fromkeys(hotels))[:10]  # Remove duplicates and limit to 10
+    # Copy so callers cannot modify the cached result
+    return list(_extract_hotels(itinerary_text))
+
+
+@functools.lru_cache(maxsize=128)
+def _extract_hotels(itinerary_text: str) -> tuple:
+    """Return the hotel names in an itinerary as a tuple."""
+    if not _HOTEL_HINT_RE.search(itinerary_text):
+        return ()
     
-    return hotels
\ No newline at end of file
+    hotels = []
+    seen = set()
+    # No hotel name spans lines, so only lines with a keyword or a label need
+    # the extraction regexes
+    for line in itinerary_text.splitlines():
+        if not _HOTEL_HINT_RE.search(line):
+            continue
+        found = [(match.start(), match.group(1)) for match in _HOTEL_LABEL_RE.finditer(line)]
+        if found:
+            # Blank the labelled spans (keeping offsets) so the other patterns
+            # find the remaining hotels without swallowing the labels
+            line = _HOTEL_LABEL_RE.sub(lambda match: "，" * len(match.group()), line)
+        found.extend((match.start(), match.group(match.lastgroup)) for match in _HOTEL_RE.finditer(line))
+        found.sort()
+        for _, hotel in found:
+            hotel = hotel.strip()
+            if hotel and hotel not in seen:
+                seen.add(hotel)
+                hotels.append(hotel)
+                if len(hotels) == _MAX_HOTELS:
+                    return tuple(hotels)
+    
+    return tuple(hotels)
\ No newline at end of file
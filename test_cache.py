@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""Test the response and result caches without calling the model API."""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+# Cache files go to a throwaway directory; set before the config is imported
+_CACHE_DIR = tempfile.mkdtemp(prefix="travel_cache_test_")
+os.environ["CACHE_DIR"] = _CACHE_DIR
+os.environ.setdefault("MODEL_API_KEY", "test")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+
+from api import openai_client
+from api.openai_client import OpenAIClient, _retry_delay
+from api.response_cache import DiskCache, ExactMatchCache, SemanticCache
+from config.config import RETRY_MAX_DELAY
+from core import llm_cache, travel_functions
+from core.llm_cache import LLMCache, cached_llm
+
+def _same_embedding(text):
+    """Embed every text identically, so only the partition decides a semantic hit."""
+    return [1.0, 0.0]
+
+def _fake_client(contents):
+    """
+    Build an OpenAIClient whose completions come from a list instead of the API.
+    
+    Each entry is returned as the message content of one call, or raised
+    if it is an exception. The client's caches live in a fresh directory.
+    """
+    cache_dir = tempfile.mkdtemp(dir=_CACHE_DIR)
+    client = OpenAIClient.__new__(OpenAIClient)
+    client.client = None
+    client.last_usage = None
+    client.exact_cache = ExactMatchCache(16)
+    client.disk_cache = DiskCache(os.path.join(cache_dir, "response.sqlite3"))
+    client.semantic_cache = SemanticCache(
+        os.path.join(cache_dir, "semantic.sqlite3"), embed_fn=_same_embedding, threshold=0.5
+    )
+    client.calls = []
+    
+    def create(**kwargs):
+        client.calls.append(kwargs)
+        content = contents.pop(0)
+        if isinstance(content, Exception):
+            raise content
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+    
+    client._create_completion = create
+    return client
+
+def _pending(wrapper):
+    """Return the embeddings a cached_llm wrapper keeps until store() or discard()."""
+    for cell in wrapper.discard.__closure__:
+        if isinstance(cell.cell_contents, dict):
+            return cell.cell_contents
+    raise LookupError("pending embeddings not found")
+
+def _check(description, ok):
+    """Print one check result and fail the test if it did not pass."""
+    print(f"{'✅' if ok else '❌'} {description}")
+    assert ok, description
+
+def test_unwritable_cache_path():
+    """Test that a cache whose database cannot be created never raises."""
+    print("=== 测试无法写入的缓存路径 ===\n")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        # A regular file where the cache directory would have to be created
+        blocker = os.path.join(tmp, "blocker")
+        open(blocker, "w").close()
+        broken = LLMCache(os.path.join(blocker, "sub", "llm_cache.sqlite3"))
+        
+        broken.set("key", "value")
+        _check("写入失败时不抛出异常", True)
+        _check("读取失败时视为未命中", broken.get("key") is None)
+        
+        calls = []
+        
+        @cached_llm("test_unwritable")
+        def render(destination):
+            calls.append(destination)
+            return f"{destination}行程"
+        
+        saved, llm_cache._cache = llm_cache._cache, broken
+        try:
+            first = render("北京")
+            second = render("北京")
+        finally:
+            llm_cache._cache = saved
+        _check("缓存不可用时仍返回生成结果", first == second == "北京行程")
+        _check("缓存不可用时每次都调用模型", len(calls) == 2)
+
+def test_hit_miss_and_expiry():
+    """Test cache hits and misses, expiry and the time-sensitive bypass."""
+    print("\n\n=== 测试缓存命中与过期 ===\n")
+    
+    cache = LLMCache(os.path.join(_CACHE_DIR, "ttl.sqlite3"), ttl=0.2)
+    _check("未写入时未命中", cache.get("key") is None)
+    cache.set("key", "value")
+    _check("写入后命中", cache.get("key") == "value")
+    time.sleep(0.3)
+    _check("过期后未命中", cache.get("key") is None)
+    
+    calls = []
+    
+    @cached_llm("test_time_sensitive")
+    def render(special_needs):
+        calls.append(special_needs)
+        return f"清单{len(calls)}"
+    
+    render("常规旅行")
+    render("常规旅行")
+    _check("普通请求第二次命中缓存", len(calls) == 1)
+    render("需要最新的天气和实时路况")
+    render("需要最新的天气和实时路况")
+    _check("含时效性词语的请求不走缓存", len(calls) == 3)
+    
+    client = _fake_client(["第一次", "第二次"])
+    first = client.generate_response("系统", "请查询今天的天气")
+    second = client.generate_response("系统", "请查询今天的天气")
+    _check("客户端对时效性请求每次调用接口", (first, second) == ("第一次", "第二次"))
+
+def test_no_store_on_empty_or_error():
+    """Test that empty results and failed calls are never cached."""
+    print("\n\n=== 测试空结果与异常不缓存 ===\n")
+    
+    results = ["", RuntimeError("模型错误"), "行程"]
+    
+    @cached_llm("test_no_store")
+    def render(destination):
+        result = results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+    
+    _check("空结果照常返回", render("杭州") == "")
+    try:
+        render("杭州")
+        raised = False
+    except RuntimeError:
+        raised = True
+    _check("异常照常抛出", raised)
+    _check("空结果与异常后仍调用模型", render("杭州") == "行程" and not results)
+    
+    client = _fake_client([None, "正常回复"])
+    _check("无内容的回复返回空字符串", client.generate_response("系统", "推荐酒店") == "")
+    _check("空回复不写入缓存", client.generate_response("系统", "推荐酒店") == "正常回复")
+    _check("两次都调用了接口", len(client.calls) == 2)
+    
+    client = _fake_client(["正常回复"])
+    client.disk_cache.set = client.disk_cache.get = lambda *args: 1 / 0
+    _check("缓存异常不影响接口结果", client.generate_response("系统", "推荐景点") == "正常回复")
+
+def test_semantic_partition():
+    """Test that semantic hits never cross the exact partition."""
+    print("\n\n=== 测试语义缓存分区 ===\n")
+    
+    calls = []
+    
+    @cached_llm("test_partition", semantic_threshold=0.5, semantic_fields=("health_focus",))
+    def render(destination, health_focus):
+        calls.append(destination)
+        return f"{destination}行程"
+    
+    saved = llm_cache._semantic_cache
+    llm_cache._semantic_cache = SemanticCache(
+        os.path.join(_CACHE_DIR, "llm_semantic.sqlite3"), embed_fn=_same_embedding
+    )
+    try:
+        render("北京", ["饮食清淡"])
+        shanghai = render("上海", ["饮食清淡"])
+        similar = render("北京", ["定期休息"])
+    finally:
+        llm_cache._semantic_cache = saved
+    _check("不同目的地不共享结果", shanghai == "上海行程")
+    _check("同一目的地的相近偏好命中语义缓存", similar == "北京行程" and calls == ["北京", "上海"])
+    
+    client = _fake_client(["春季推荐", "冬季推荐"])
+    spring = client.generate_destination_recommendations("春季", "身体健康", "舒适型", "温泉养生")
+    winter = client.generate_destination_recommendations("冬季", "身体健康", "舒适型", "温泉养生")
+    similar = client.generate_destination_recommendations("春季", "身体健康", "舒适型", "温泉")
+    _check("不同季节不共享推荐", (spring, winter) == ("春季推荐", "冬季推荐"))
+    _check("同一分区的相近兴趣命中语义缓存", similar == "春季推荐" and len(client.calls) == 2)
+    
+    client = _fake_client(["哮喘清单", "普通清单"])
+    first = client.generate_checklist("北京", "上海", "3-5天", "有哮喘")
+    second = client.generate_checklist("北京", "上海", "3-5天", "没有哮喘")
+    _check("清单只按精确匹配复用", (first, second) == ("哮喘清单", "普通清单"))
+
+def test_retry_after():
+    """Test the wait computed from the Retry-After header."""
+    print("\n\n=== 测试 Retry-After 处理 ===\n")
+    
+    def error(retry_after=None):
+        headers = {"retry-after": retry_after} if retry_after is not None else {}
+        return SimpleNamespace(response=SimpleNamespace(headers=headers))
+    
+    _check("遵循服务端给出的等待时间", _retry_delay(error("3"), 0) == 3.0)
+    _check("负数等待视为立即重试", _retry_delay(error("-5"), 0) == 0.0)
+    _check("过长的等待截断为上限", _retry_delay(error("3600"), 0) == RETRY_MAX_DELAY)
+    _check("无法解析时退回指数退避", 0 < _retry_delay(error("soon"), 0) <= RETRY_MAX_DELAY)
+    _check("退避时间不超过上限", _retry_delay(error(), 20) == RETRY_MAX_DELAY)
+
+def test_stream_discard_on_failure():
+    """Test that a failed or abandoned stream releases its pending embedding."""
+    print("\n\n=== 测试流式生成失败时的清理 ===\n")
+    
+    def fragments(fail):
+        yield "第一天："
+        if fail:
+            raise RuntimeError("连接中断")
+        yield "游览西湖"
+    
+    class StreamClient:
+        fail = True
+        
+        def generate_itinerary_plan(self, **kwargs):
+            return fragments(self.fail)
+    
+    stream_client = StreamClient()
+    pending = _pending(travel_functions._render_itinerary_plan)
+    saved = (travel_functions.get_client, llm_cache._semantic_cache)
+    travel_functions.get_client = lambda: stream_client
+    llm_cache._semantic_cache = SemanticCache(
+        os.path.join(_CACHE_DIR, "stream_semantic.sqlite3"), embed_fn=_same_embedding
+    )
+    try:
+        outputs = list(travel_functions.stream_itinerary_plan("杭州", "3-5天", "行走自如", ["饮食清淡"]))
+        _check("失败时给出错误提示", outputs[-1].startswith("抱歉"))
+        _check("失败后不保留待存的向量", not pending)
+        
+        stream = travel_functions.stream_itinerary_plan("苏州", "3-5天", "行走自如", ["饮食清淡"])
+        next(stream)
+        _check("生成过程中保留待存的向量", len(pending) == 1)
+        stream.close()
+        _check("中途关闭后不保留待存的向量", not pending)
+        
+        stream_client.fail = False
+        outputs = list(travel_functions.stream_itinerary_plan("南京", "3-5天", "行走自如", ["饮食清淡"]))
+        cached = travel_functions._render_itinerary_plan.lookup("南京", "3-5天", "行走自如", ["饮食清淡"])
+        _check("成功后结果写入缓存", outputs[-1] == cached == "第一天：游览西湖")
+    finally:
+        travel_functions.get_client, llm_cache._semantic_cache = saved
+
+if __name__ == "__main__":
+    try:
+        test_unwritable_cache_path()
+        test_hit_miss_and_expiry()
+        test_no_store_on_empty_or_error()
+        test_semantic_partition()
+        test_retry_after()
+        test_stream_discard_on_failure()
+        print("\n🎉 缓存测试完成!")
+    except Exception as e:
+        print(f"\n❌ 测试失败: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+    finally:
+        shutil.rmtree(_CACHE_DIR, ignore_errors=True)
\ No newline at end of file
@@ -1,39 +1,61 @@
 import json
 import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _load_record(entry):
+    """Read one history file; returns the record, or the exception if it failed."""
+    try:
+        with open(entry.path, 'rb') as f:
+            content = f.read()
+        data = orjson.loads(content) if orjson is not None else json.loads(content)
+        return {
+            "id": data.get("id", ""),
+            "destination": data.get("destination", ""),
+            "duration": data.get("duration", ""),
+            "timestamp": data.get("timestamp", ""),
+            "filename": entry.name
+        }
+    except Exception as e:
+        return e
 
 def test_history():
     history = []
     save_dir = "checklist_data"
+    # Output is collected and written once, not flushed line by line
+    log = []
 
-    print(f"检查目录: {save_dir}")
-    print(f"目录存在: {os.path.exists(save_dir)}")
+    log.append(f"检查目录: {save_dir}\n")
+    log.append(f"目录存在: {os.path.exists(save_dir)}\n")
 
     if not os.path.exists(save_dir):
+        sys.stdout.write("".join(log))
         return []
 
-    for filename in os.listdir(save_dir):
-        print(f"处理文件: {filename}")
-        if filename.endswith(".json"):
-            file_path = os.path.join(save_dir, filename)
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    record = {
-                        "id": data.get("id", ""),
-                        "destination": data.get("destination", ""),
-                        "duration": data.get("duration", ""),
-                        "timestamp": data.get("timestamp", ""),
-                        "filename": filename
-                    }
-                    history.append(record)
-                    print(f"  成功加载: {record['destination']} - {record['timestamp']}")
-            except Exception as e:
-                print(f"  加载失败: {e}")
-
-    print(f"\n总共加载 {len(history)} 条记录")
+    files = []
+    with os.scandir(save_dir) as entries:
+        for entry in entries:
+            log.append(f"处理文件: {entry.name}\n")
+            if entry.name.endswith(".json") and entry.is_file():
+                files.append(entry)
+
+    # Reads overlap with parsing across threads; results keep directory order
+    with ThreadPoolExecutor(max_workers=min(16, len(files) or 1)) as pool:
+        for entry, result in zip(files, pool.map(_load_record, files)):
+            if isinstance(result, Exception):
+                log.append(f"  加载失败 {entry.name}: {result}\n")
+                continue
+            history.append(result)
+            log.append(f"  成功加载: {result['destination']} - {result['timestamp']}\n")
+
+    log.append(f"\n总共加载 {len(history)} 条记录\n")
+    sys.stdout.write("".join(log))
     return history
 
 if __name__ == "__main__":
     history = test_history()
-    for h in history[:5]:
-        print(f"{h['destination']} ({h['duration']}) - {h['timestamp']}")
+    sys.stdout.write("".join(f"{h['destination']} ({h['duration']}) - {h['timestamp']}\n" for h in history[:5]))
@@ -89,10 +89,53 @@ def test_various_patterns():
             print("❌ 未提取到任何酒店")
         print("-" * 40)
 
+def test_label_after_text():
+    """Test that a label preceded by other text yields only the name."""
+    print("\n\n=== 测试标签前有其他文字 ===\n")
+    
+    test_text = "第二天 入住：桔子水晶酒店，早餐后出发"
+    expected = ["桔子水晶酒店"]
+    hotels = extract_hotels_from_itinerary(test_text)
+    print(f"文本: {test_text}")
+    print(f"提取: {hotels}")
+    print(f"预期: {expected}")
+    
+    status = "✅" if hotels == expected else "❌"
+    print(f"{status} 匹配成功" if hotels == expected else f"{status} 匹配失败")
+    assert hotels == expected, f"提取结果不符: {hotels}"
+
+def test_label_without_keyword():
+    """Test labelled lodging whose name has no hotel keyword."""
+    print("\n\n=== 测试无酒店关键词的住宿标签 ===\n")
+    
+    test_cases = [
+        ("入住：北京饭店", ["北京饭店"]),
+        ("下榻：北京饭店", ["北京饭店"]),
+        ("推荐住宿：锦江之星", ["锦江之星"]),
+        ("第一天：\n- 游览外滩\n住宿：华侨大厦\n第二天：\n- 返程", ["华侨大厦"]),
+        # 其他行含酒店关键词时，仅有标签的行也要提取
+        ("第一天：\n入住：北京饭店\n第二天：\n- 晚上入住王府井希尔顿酒店", ["北京饭店", "晚上入住王府井希尔顿酒店"]),
+        # 同一行标签后的其他酒店也要提取
+        ("住宿：汉庭酒店，或者如家酒店", ["汉庭酒店", "或者如家酒店"]),
+    ]
+    
+    for test_text, expected in test_cases:
+        hotels = extract_hotels_from_itinerary(test_text)
+        print(f"文本: {test_text!r}")
+        print(f"提取: {hotels}")
+        print(f"预期: {expected}")
+        
+        status = "✅" if hotels == expected else "❌"
+        print(f"{status} 匹配成功" if hotels == expected else f"{status} 匹配失败")
+        print("-" * 40)
+        assert hotels == expected, f"提取结果不符: {hotels}"
+
 if __name__ == "__main__":
     try:
         test_detailed_extraction()
         test_various_patterns()
+        test_label_after_text()
+        test_label_without_keyword()
         print("\n🎉 详细测试完成!")
     except Exception as e:
         print(f"\n❌ 测试失败: {e}")
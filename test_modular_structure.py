@@ -3,124 +3,195 @@ Module validation test script for the travel assistant application.
 Tests all modules and their imports to ensure the modular structure works correctly.
 """
 
+import importlib
 import sys
 import os
+import tempfile
 from pathlib import Path
+from types import MappingProxyType
+
+# Add src to path, once however often the checks run
+_SRC_PATH = str((Path(__file__).parent / 'src').resolve())
+if _SRC_PATH not in sys.path:
+    sys.path.insert(0, _SRC_PATH)
+
+# Summary labels, indexed by the boolean result
+_PASS_FAIL = ("❌ 失败", "✅ 通过")
+_OVERALL = ("❌ 模块化结构验证失败!", "✅ 模块化结构验证通过!")
+_SKIPPED = "⏭️ 未运行"
+
+# Shown after a successful run
+_SUCCESS_GUIDE = """
+🎉 恭喜! 旅行助手应用已成功模块化!
+📁 模块结构:
+  ├── src/config/     - 配置和常量
+  ├── src/api/        - API客户端
+  ├── src/utils/      - 工具函数
+  ├── src/core/       - 核心旅行功能
+  ├── src/data/       - 数据处理
+  ├── src/ui/         - UI组件
+  └── src/main.py     - 主应用入口
+
+🚀 使用方法:
+  python travel_assistant_modular.py  # 启动应用
+  # 或
+  cd src && python main.py  # 从src目录启动"""
+
+# (test name, module, names the module must provide)
+_TESTS = (
+    ("配置模块", "config.config", ("APP_TITLE", "API_KEY")),
+    ("API客户端", "api.openai_client", ("OpenAIClient", "get_client")),
+    ("工具函数", "utils.helpers", ("clean_response", "validate_inputs", "safe_json_parse")),
+    ("核心功能", "core.travel_functions", ("generate_destination_recommendation", "generate_itinerary_plan", "generate_checklist")),
+    ("数据处理", "data.processors", ("save_checklist_data", "load_checklist_data")),
+    ("UI组件", "ui.components", ("create_header", "create_app_theme", "create_destination_section")),
+    ("主应用", "main", ("create_app", "main")),
+)
+# Distinct modules in check order
+_TEST_MODULES = tuple(dict.fromkeys(module_name for _, module_name, _ in _TESTS))
+
+# Inputs for the function-call check; validate_inputs only reads them
+_TEST_INPUTS = MappingProxyType({
+    'season': '春季',
+    'health_status': '健康',
+    'budget': '中等',
+    'interests': '休闲',
+    'mobility': '良好'
+})
+# (origin, destination, duration) passed to save_checklist_data
+_SAVE_ARGS = ("北京", "上海", "3天")
+
+def _emit(lines):
+    """Write status lines as one block, encoded once with the stream's own settings."""
+    stream = sys.stdout
+    text = "\n".join(lines) + "\n"
+    buffer = getattr(stream, "buffer", None)
+    if buffer is None:
+        # Replaced streams (IDE consoles, capture) may only accept text
+        stream.write(text)
+        return
+    # Earlier text output must reach the buffer first to keep the order
+    stream.flush()
+    buffer.write(text.encode(stream.encoding or "utf-8", stream.errors or "strict"))
+    buffer.flush()
 
 def test_module_imports():
     """Test that all modules can be imported correctly."""
-    print("🔍 正在测试模块化结构...")
-    
-    # Add src to path
-    src_path = Path(__file__).parent / 'src'
-    sys.path.insert(0, str(src_path))
-    
-    tests = [
-        ("配置模块", "from config.config import APP_TITLE, API_KEY"),
-        ("API客户端", "from api.openai_client import OpenAIClient, get_client"),
-        ("工具函数", "from utils.helpers import clean_response, validate_inputs, safe_json_parse"),
-        ("核心功能", "from core.travel_functions import generate_destination_recommendation, generate_itinerary_plan, generate_checklist"),
-        ("数据处理", "from data.processors import save_checklist_data, load_checklist_data"),
-        ("UI组件", "from ui.components import create_header, create_app_theme, create_destination_section"),
-        ("主应用", "from main import create_app, main"),
-    ]
+    # Status lines are collected and written in one go at the end
+    out = ["🔍 正在测试模块化结构..."]
     
-    results = []
-    for test_name, import_statement in tests:
+    # Import every module once; a failure is recorded instead of retried per check
+    loaded = {}
+    for module_name in _TEST_MODULES:
         try:
-            exec(import_statement)
-            print(f"✅ {test_name}: 导入成功")
-            results.append(True)
+            loaded[module_name] = importlib.import_module(module_name)
         except Exception as e:
-            print(f"❌ {test_name}: 导入失败 - {e}")
+            loaded[module_name] = e
+    
+    results = []
+    for test_name, module_name, names in _TESTS:
+        module = loaded[module_name]
+        if isinstance(module, Exception):
+            out.append(f"❌ {test_name}: 导入失败 - {module}")
+            results.append(False)
+            continue
+        missing = [name for name in names if not hasattr(module, name)]
+        if missing:
+            out.append(f"❌ {test_name}: 导入失败 - 缺少 {', '.join(missing)}")
             results.append(False)
+        else:
+            out.append(f"✅ {test_name}: 导入成功")
+            results.append(True)
     
+    _emit(out)
     return all(results)
 
 def test_function_calls():
     """Test that key functions can be called."""
-    print("\n🔍 正在测试函数调用...")
+    out = ["\n🔍 正在测试函数调用..."]
     
     try:
         # Test configuration access
         from config.config import APP_TITLE, INTEREST_OPTIONS
-        print(f"✅ 配置访问: {APP_TITLE}")
-        print(f"✅ 兴趣选项: {len(INTEREST_OPTIONS)} 个选项")
+        out.append(f"✅ 配置访问: {APP_TITLE}")
+        out.append(f"✅ 兴趣选项: {len(INTEREST_OPTIONS)} 个选项")
         
         # Test utility functions
-        from utils.helpers import validate_inputs, clean_response
-        test_inputs = {
-            'season': '春季',
-            'health_status': '健康',
-            'budget': '中等',
-            'interests': '休闲',
-            'mobility': '良好'
-        }
-        result = validate_inputs(test_inputs)
-        print(f"✅ 输入验证: {result}")
+        from utils.helpers import validate_inputs
+        result = validate_inputs(_TEST_INPUTS)
+        out.append(f"✅ 输入验证: {result}")
         
         # Test data processors
-        from data.processors import save_checklist_data, load_checklist_data
+        from data.processors import save_checklist_data
         test_data = {"test": "data"}
-        result = save_checklist_data(test_data, "北京", "上海", "3天")
-        print(f"✅ 数据保存: {result}")
+        # The test file is removed together with the directory
+        with tempfile.TemporaryDirectory() as data_dir:
+            result = save_checklist_data(test_data, *_SAVE_ARGS, data_dir=data_dir)
+            out.append(f"✅ 数据保存: {result}")
         
-        # Clean up test file
-        import os
-        if os.path.exists("test_checklist.json"):
-            os.remove("test_checklist.json")
-        
-        return True
+        success = True
         
     except Exception as e:
-        print(f"❌ 函数调用测试失败: {e}")
-        return False
+        out.append(f"❌ 函数调用测试失败: {e}")
+        success = False
+    
+    _emit(out)
+    return success
+
+_app = None
+
+def _get_app():
+    """Create the application once and reuse it for later checks."""
+    global _app
+    if _app is None:
+        from main import create_app
+        _app = create_app()
+    return _app
 
 def test_application_creation():
     """Test that the main application can be created."""
-    print("\n🔍 正在测试应用创建...")
+    out = ["\n🔍 正在测试应用创建..."]
     
     try:
-        from main import create_app
-        app = create_app()
-        print(f"✅ 应用创建成功: {type(app)}")
-        return True
+        app = _get_app()
+        out.append(f"✅ 应用创建成功: {type(app)}")
+        success = True
     except Exception as e:
-        print(f"❌ 应用创建失败: {e}")
-        return False
+        out.append(f"❌ 应用创建失败: {e}")
+        success = False
+    
+    _emit(out)
+    return success
 
 def main():
     """Run all tests."""
-    print("🚀 开始模块化结构验证测试\n")
+    _emit(["🚀 开始模块化结构验证测试\n"])
+    
+    phases = (
+        ("模块导入", test_module_imports),
+        ("函数调用", test_function_calls),
+        ("应用创建", test_application_creation),
+    )
+    results = {}
+    
+    def run(name, test):
+        results[name] = test()
+        return results[name]
     
-    # Run tests
-    import_success = test_module_imports()
-    function_success = test_function_calls()
-    app_success = test_application_creation()
+    # Later phases fail anyway once one fails, so stop at the first failure
+    overall_success = all(run(name, test) for name, test in phases)
     
-    print(f"\n📊 测试结果总结:")
-    print(f"模块导入: {'✅ 通过' if import_success else '❌ 失败'}")
-    print(f"函数调用: {'✅ 通过' if function_success else '❌ 失败'}")
-    print(f"应用创建: {'✅ 通过' if app_success else '❌ 失败'}")
+    out = ["\n📊 测试结果总结:"]
+    for name, _ in phases:
+        out.append(f"{name}: {_PASS_FAIL[results[name]] if name in results else _SKIPPED}")
     
-    overall_success = import_success and function_success and app_success
-    print(f"\n🎯 整体结果: {'✅ 模块化结构验证通过!' if overall_success else '❌ 模块化结构验证失败!'}")
+    out.append(f"\n🎯 整体结果: {_OVERALL[overall_success]}")
     
-    if overall_success:
-        print("\n🎉 恭喜! 旅行助手应用已成功模块化!")
-        print("📁 模块结构:")
-        print("  ├── src/config/     - 配置和常量")
-        print("  ├── src/api/        - API客户端")
-        print("  ├── src/utils/      - 工具函数")
-        print("  ├── src/core/       - 核心旅行功能")
-        print("  ├── src/data/       - 数据处理")
-        print("  ├── src/ui/         - UI组件")
-        print("  └── src/main.py     - 主应用入口")
-        print("\n🚀 使用方法:")
-        print("  python travel_assistant_modular.py  # 启动应用")
-        print("  # 或")
-        print("  cd src && python main.py  # 从src目录启动")
+    # The guide is for people at a terminal; CI logs only need the result
+    if overall_success and sys.stdout.isatty():
+        out.append(_SUCCESS_GUIDE)
     
+    _emit(out)
     return overall_success
 
 if __name__ == "__main__":
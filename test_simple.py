@@ -1,34 +1,40 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import os
+import sys
+
 # 简单测试清单生成函数
 try:
-    import sys
-    import os
     sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
     # 导入函数
     from travel_assistant_improved import generate_checklist
 
-    print("开始测试清单生成功能...")
-
     # 测试参数
     destination = "北京"
     duration = "3天2夜"
     special_needs = "常规旅行"
 
-    print(f"目的地: {destination}")
-    print(f"时长: {duration}")
-    print(f"特殊需求: {special_needs}")
+    # 参数一次性输出，生成较慢，调用前先写出
+    sys.stdout.write(
+        "开始测试清单生成功能...\n"
+        f"目的地: {destination}\n"
+        f"时长: {duration}\n"
+        f"特殊需求: {special_needs}\n"
+    )
+    sys.stdout.flush()
 
     # 调用函数
     result = generate_checklist(destination, duration, special_needs)
 
-    print(f"生成成功！结果长度: {len(result)}")
-    print("前100个字符:")
-    print(result[:100])
+    sys.stdout.write(f"生成成功！结果长度: {len(result)}\n前100个字符:\n{result[:100]}\n")
 
 except Exception as e:
-    print(f"错误: {e}")
-    import traceback
-    traceback.print_exc()
\ No newline at end of file
+    # 完整堆栈仅在设置 TEST_VERBOSE 时输出
+    if os.environ.get("TEST_VERBOSE"):
+        import traceback
+        print(f"错误: {e}")
+        traceback.print_exc()
+    else:
+        print(f"错误: {type(e).__name__}: {e}")
\ No newline at end of file